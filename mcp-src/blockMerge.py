@@ -0,0 +1,198 @@
+"""
+Block-aware merge for the merge tool's smart strategy.
+
+Each version of a file is split into units: module level functions, methods
+(of classes at any depth), runs of imports, and the gaps between them, keyed
+by qualified name. Units are merged by key, so a function moved, added or
+rewritten on one side is taken whole from that side:
+
+- with a base file, a unit only one side changed is taken from that side; a
+  unit both sides changed is merged line by line (diff3) and, if those
+  edits overlap, kept whole from both sides between conflict markers. Gaps
+  with overlapping edits get line level conflict markers instead.
+- without a base, new is taken as the newer version of every unit both
+  sides have, import runs are combined, and units only one side has are kept.
+
+Units are compared by key in one pass and only changed units are diffed, so
+the merge runs in about linear time in the file size.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from diffEngines import DEFAULT_ENGINE, matching_blocks
+from semanticBlocks import BlockIndex, SemanticBlock
+
+UNIT_TYPES = ("function", "method", "imports")
+
+Key = Tuple[str, Optional[str]]  # ("block", qualname) or ("gap", qualname of the unit before it)
+Units = Dict[Key, List[str]]
+
+@dataclass
+class MergeResult:
+    lines: List[str]
+    conflicts: int = 0
+    from_local: int = 0  # Changed units taken from one side
+    from_new: int = 0
+    merged: int = 0  # Units both sides changed, merged line by line
+    replaced: List[str] = field(default_factory=list)  # Without a base, units where new replaced a different local
+
+def is_unit(block: SemanticBlock) -> bool:
+    """Functions, methods and import runs that are not nested in a function"""
+    if block.type not in UNIT_TYPES:
+        return False
+    parent = block.parent
+    while parent is not None:
+        if parent.type != "class":
+            return False
+        parent = parent.parent
+    return True
+
+def split_units(lines: Sequence[str], index: BlockIndex) -> Units:
+    """Units of a file in order, every line belongs to exactly one"""
+    units: Units = {}
+    position = 1
+    previous = None
+    for block in index.blocks:
+        if not is_unit(block) or block.start_line < position:
+            continue
+        if position < block.start_line:
+            units[("gap", previous)] = list(lines[position - 1:block.start_line - 1])
+        units[("block", block.qualname)] = list(lines[block.start_line - 1:block.end_line])
+        previous = block.qualname
+        position = block.end_line + 1
+    if position <= len(lines):
+        units[("gap", previous)] = list(lines[position - 1:])
+    return units
+
+def merge_order(local_keys: Sequence[Key], new_keys: Sequence[Key]) -> List[Key]:
+    """Local order, with keys only new has placed after the key new has before them"""
+    local_set = set(local_keys)
+    inserted = defaultdict(list)  # key -> new-only keys that follow it, None for the start
+    anchor = None
+    for key in new_keys:
+        if key in local_set:
+            anchor = key
+        else:
+            inserted[anchor].append(key)
+    order = list(inserted[None])
+    for key in local_keys:
+        order.append(key)
+        order.extend(inserted[key])
+    return order
+
+def unit_label(key: Key) -> str:
+    if key[0] == "block":
+        return key[1]
+    return f"lines after {key[1]}" if key[1] else "lines before the first unit"
+
+def conflict_lines(local: Sequence[str], base: Optional[Sequence[str]], new: Sequence[str]) -> List[str]:
+    lines = ["<<<<<<< local", *local]
+    if base is not None:
+        lines += ["||||||| base", *base]
+    return lines + ["=======", *new, ">>>>>>> new"]
+
+def _sync_regions(base: Sequence[str], local: Sequence[str], new: Sequence[str], engine: str):
+    """Base runs unchanged on both sides, as (base, local, new) start and end pairs"""
+    local_matches = matching_blocks(base, local, engine)
+    new_matches = matching_blocks(base, new, engine)
+    regions = []
+    i = j = 0
+    while i < len(local_matches) - 1 and j < len(new_matches) - 1:
+        local_base, local_start, local_size = local_matches[i]
+        new_base, new_start, new_size = new_matches[j]
+        start = max(local_base, new_base)
+        end = min(local_base + local_size, new_base + new_size)
+        if start < end:
+            regions.append((start, end, local_start + start - local_base, local_start + end - local_base,
+                            new_start + start - new_base, new_start + end - new_base))
+        if local_base + local_size < new_base + new_size:
+            i += 1
+        else:
+            j += 1
+    regions.append((len(base), len(base), len(local), len(local), len(new), len(new)))
+    return regions
+
+def merge3_lines(base: Sequence[str], local: Sequence[str], new: Sequence[str],
+                 engine: str = DEFAULT_ENGINE) -> Tuple[List[str], int]:
+    """diff3 merge of lines, returning the merged lines and the number of conflicts marked in them"""
+    merged = []
+    conflicts = 0
+    base_at = local_at = new_at = 0
+    for base_start, base_end, local_start, local_end, new_start, new_end in _sync_regions(base, local, new, engine):
+        base_chunk = base[base_at:base_start]
+        local_chunk = local[local_at:local_start]
+        new_chunk = new[new_at:new_start]
+        if local_chunk == new_chunk or new_chunk == base_chunk:
+            merged.extend(local_chunk)
+        elif local_chunk == base_chunk:
+            merged.extend(new_chunk)
+        else:
+            merged.extend(conflict_lines(local_chunk, base_chunk, new_chunk))
+            conflicts += 1
+        merged.extend(base[base_start:base_end])
+        base_at, local_at, new_at = base_end, local_end, new_end
+    return merged, conflicts
+
+def _union(local: Sequence[str], new: Sequence[str]) -> List[str]:
+    seen = set(local)
+    return list(local) + [line for line in new if line not in seen]
+
+def smart_merge(local_lines: Sequence[str], new_lines: Sequence[str], base_lines: Optional[Sequence[str]] = None,
+                local_index: Optional[BlockIndex] = None, new_index: Optional[BlockIndex] = None,
+                base_index: Optional[BlockIndex] = None, engine: str = DEFAULT_ENGINE) -> MergeResult:
+    """Merge new into local unit by unit, three-way when base_lines is given"""
+    local_index = local_index or BlockIndex.build("\n".join(local_lines))
+    new_index = new_index or BlockIndex.build("\n".join(new_lines))
+    local_units = split_units(local_lines, local_index)
+    new_units = split_units(new_lines, new_index)
+    base_units = None
+    if base_lines is not None:
+        base_index = base_index or BlockIndex.build("\n".join(base_lines))
+        base_units = split_units(base_lines, base_index)
+
+    result = MergeResult([])
+    for key in merge_order(list(local_units), list(new_units)):
+        local = local_units.get(key)
+        new = new_units.get(key)
+        if base_units is None:
+            result.lines.extend(_resolve_two_way(key, local, new, result))
+            continue
+        base = base_units.get(key)
+        if key[0] == "gap":
+            # A gap that is missing is just empty
+            local, new, base = local or [], new or [], base or []
+        result.lines.extend(_resolve_three_way(key, base, local, new, result, engine))
+    return result
+
+def _resolve_two_way(key: Key, local: Optional[List[str]], new: Optional[List[str]], result: MergeResult) -> List[str]:
+    if local == new or new is None:
+        return local or []
+    if local is None:
+        return new
+    result.from_new += 1
+    if key[0] == "block" and key[1].split("#")[0] == "<imports>":
+        return _union(local, new)
+    result.replaced.append(unit_label(key))
+    return new
+
+def _resolve_three_way(key: Key, base: Optional[List[str]], local: Optional[List[str]], new: Optional[List[str]],
+                       result: MergeResult, engine: str) -> List[str]:
+    if local == new or new == base:
+        if local != base:
+            result.from_local += 1
+        return local or []
+    if local == base:
+        result.from_new += 1
+        return new or []
+    # Both sides changed this unit
+    merged, conflicts = merge3_lines(base or [], local or [], new or [], engine)
+    if not conflicts:
+        result.merged += 1
+        return merged
+    result.conflicts += 1 if key[0] == "block" else conflicts
+    if key[0] == "block":
+        # A function is taken whole from either side, never interleaved
+        return conflict_lines(local or [], base or [], new or [])
+    return merged
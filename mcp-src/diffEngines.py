@@ -0,0 +1,327 @@
+"""
+Line diff engines for the merge tool.
+
+Every engine finds the runs of lines the two inputs have in common; the runs
+are then grouped into unified diff hunks lazily, so callers can stream a diff
+without holding its text in memory.
+
+- difflib: difflib.SequenceMatcher, the reference output
+- myers: Myers' O(ND) algorithm with the linear-space middle snake split
+- patience: anchors on lines that occur once on each side, then falls back
+  to myers between anchors; robust on files with many repeated lines
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence, Tuple
+
+ENGINES = ["difflib", "myers", "patience"]
+DEFAULT_ENGINE = "patience"
+
+Match = Tuple[int, int, int]  # (local index, new index, line count)
+Opcode = Tuple[str, int, int, int, int]  # as returned by SequenceMatcher.get_opcodes()
+
+@dataclass
+class Hunk:
+    local_start: int  # 0-based, end exclusive
+    local_end: int
+    new_start: int
+    new_end: int
+    opcodes: List[Opcode]
+    lines: List[str]  # Lines prefixed with ' ', '-' or '+'
+
+    @property
+    def header(self) -> str:
+        return f"@@ -{_format_range(self.local_start, self.local_end)} +{_format_range(self.new_start, self.new_end)} @@\n"
+
+def _format_range(start: int, stop: int) -> str:
+    # Same as difflib: an empty range names the line before it
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+def _intern(local_lines: Sequence[str], new_lines: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Replace lines by small ints so comparisons do not touch the strings again"""
+    ids = {}
+    local_ids = [ids.setdefault(line, len(ids)) for line in local_lines]
+    new_ids = [ids.setdefault(line, len(ids)) for line in new_lines]
+    return local_ids, new_ids
+
+def _trim(a, b, a_lo, a_hi, b_lo, b_hi, matches: List[Match]):
+    """Record the common prefix and suffix of a region and return what is left between them"""
+    start = a_lo
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        a_lo += 1
+        b_lo += 1
+    if a_lo > start:
+        matches.append((start, b_lo - (a_lo - start), a_lo - start))
+    end = a_hi
+    while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi -= 1
+        b_hi -= 1
+    if a_hi < end:
+        matches.append((a_hi, b_hi, end - a_hi))
+    return a_lo, a_hi, b_lo, b_hi
+
+def _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Split point of a shortest edit script, searching forward and backward at once.
+
+    Only two diagonal vectors are kept, so memory is linear in the region size.
+    Returns None when the region has no line in common.
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    size = 2 * max_d + 2
+    forward = [-1] * size
+    backward = [-1] * size
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    # With an odd delta the paths meet during a forward pass, otherwise during a backward one
+    front = delta % 2 != 0
+    k1_start = k1_end = k2_start = k2_end = 0
+    for d in range(max_d):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a_lo + x1] == b[b_lo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < size and backward[k2_offset] != -1 and x1 >= n - backward[k2_offset]:
+                    return x1, y1
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a_hi - x2 - 1] == b[b_hi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, offset + x1 - k1_offset
+    return None
+
+def _myers(a, b, a_lo, a_hi, b_lo, b_hi, matches: List[Match]):
+    regions = [(a_lo, a_hi, b_lo, b_hi)]
+    while regions:
+        a_lo, a_hi, b_lo, b_hi = _trim(a, b, *regions.pop(), matches)
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        split = _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi)
+        if split is None:
+            continue
+        x, y = split
+        regions.append((a_lo, a_lo + x, b_lo, b_lo + y))
+        regions.append((a_lo + x, a_hi, b_lo + y, b_hi))
+
+def _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines that occur exactly once in both regions"""
+    local_counts = Counter(a[a_lo:a_hi])
+    new_counts = Counter(b[b_lo:b_hi])
+    local_index = {a[i]: i for i in range(a_lo, a_hi) if local_counts[a[i]] == 1}
+    pairs = [(local_index[b[j]], j) for j in range(b_lo, b_hi)
+             if new_counts[b[j]] == 1 and b[j] in local_index]
+    # Patience sorting over local indexes, pairs are already ordered by new index
+    tails, tail_pairs, previous = [], [], []
+    for pair in pairs:
+        pile = bisect_left(tails, pair[0])
+        if pile == len(tails):
+            tails.append(pair[0])
+            tail_pairs.append(len(previous))
+        else:
+            tails[pile] = pair[0]
+            tail_pairs[pile] = len(previous)
+        previous.append((pair, tail_pairs[pile - 1] if pile else -1))
+    anchors = []
+    index = tail_pairs[-1] if tail_pairs else -1
+    while index != -1:
+        pair, index = previous[index]
+        anchors.append(pair)
+    anchors.reverse()
+    return anchors
+
+def _patience(a, b, a_lo, a_hi, b_lo, b_hi, matches: List[Match]):
+    regions = [(a_lo, a_hi, b_lo, b_hi)]
+    while regions:
+        a_lo, a_hi, b_lo, b_hi = _trim(a, b, *regions.pop(), matches)
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        anchors = _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            _myers(a, b, a_lo, a_hi, b_lo, b_hi, matches)
+            continue
+        for i, j in anchors:
+            regions.append((a_lo, i, b_lo, j))
+            matches.append((i, j, 1))
+            a_lo, b_lo = i + 1, j + 1
+        regions.append((a_lo, a_hi, b_lo, b_hi))
+
+def matching_blocks(local_lines: Sequence[str], new_lines: Sequence[str], engine: str = DEFAULT_ENGINE) -> List[Match]:
+    """Common runs of lines in order, ending with (len(local), len(new), 0) like difflib"""
+    if engine == "difflib":
+        return difflib.SequenceMatcher(None, local_lines, new_lines).get_matching_blocks()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown diff engine: {engine}")
+    a, b = _intern(local_lines, new_lines)
+    found: List[Match] = []
+    (_myers if engine == "myers" else _patience)(a, b, 0, len(a), 0, len(b), found)
+    found.sort()
+    merged: List[Match] = []
+    for i, j, n in found:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + n)
+        elif n:
+            merged.append((i, j, n))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+def opcodes(matches: List[Match]) -> List[Opcode]:
+    """Turn matching blocks into SequenceMatcher style opcodes"""
+    codes = []
+    i = j = 0
+    for ai, bj, size in matches:
+        tag = "replace" if i < ai and j < bj else "delete" if i < ai else "insert" if j < bj else None
+        if tag:
+            codes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            codes.append(("equal", ai, i, bj, j))
+    return codes
+
+def iter_hunks(local_lines: Sequence[str], new_lines: Sequence[str], engine: str = DEFAULT_ENGINE,
+               context: int = 3) -> Iterator[Hunk]:
+    """Yield the hunks of a unified diff, with context lines around each change"""
+    codes = opcodes(matching_blocks(local_lines, new_lines, engine))
+    if not codes or all(code[0] == "equal" for code in codes):
+        return
+    # Trim the leading and trailing unchanged runs to the context size
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield _hunk(group, local_lines, new_lines)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield _hunk(group, local_lines, new_lines)
+
+def _hunk(group: List[Opcode], local_lines: Sequence[str], new_lines: Sequence[str]) -> Hunk:
+    lines = []
+    for tag, i1, i2, j1, j2 in group:
+        if tag == "equal":
+            lines.extend(" " + line for line in local_lines[i1:i2])
+            continue
+        if tag in ("replace", "delete"):
+            lines.extend("-" + line for line in local_lines[i1:i2])
+        if tag in ("replace", "insert"):
+            lines.extend("+" + line for line in new_lines[j1:j2])
+    return Hunk(group[0][1], group[-1][2], group[0][3], group[-1][4], group, lines)
+
+def unified_diff(local_lines: Sequence[str], new_lines: Sequence[str], fromfile: str = "local", tofile: str = "new",
+                 engine: str = DEFAULT_ENGINE, context: int = 3) -> Iterator[str]:
+    """Unified diff lines as produced by difflib.unified_diff, computed by engine"""
+    started = False
+    for hunk in iter_hunks(local_lines, new_lines, engine, context):
+        if not started:
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+            started = True
+        yield hunk.header
+        yield from hunk.lines
+
+def synthetic_file(line_count: int, seed: int = 0) -> List[str]:
+    """Python-like source where blank lines, returns and closing brackets repeat a lot"""
+    rng = random.Random(seed)
+    common = ["\n", "    return None\n", "        pass\n", "    )\n", "]\n", "    # TODO\n"]
+    lines = []
+    while len(lines) < line_count:
+        lines.append(f"def function_{len(lines)}(value):\n")
+        for _ in range(rng.randint(3, 12)):
+            lines.append(rng.choice(common) if rng.random() < 0.6 else f"    value = value * {rng.randint(0, 99)}\n")
+    return lines[:line_count]
+
+def edited_copy(lines: List[str], edit_ratio: float = 0.01, seed: int = 1) -> List[str]:
+    """Copy of lines with about edit_ratio of them deleted, replaced or preceded by a new line"""
+    rng = random.Random(seed)
+    edited = []
+    for line in lines:
+        roll = rng.random()
+        if roll < edit_ratio / 3:
+            continue
+        if roll < 2 * edit_ratio / 3:
+            edited.append(f"    changed = {rng.randint(0, 10 ** 6)}\n")
+            continue
+        if roll < edit_ratio:
+            edited.append("\n" if rng.random() < 0.5 else f"    added = {rng.randint(0, 10 ** 6)}\n")
+        edited.append(line)
+    return edited
+
+def benchmark(sizes: List[int], engines: List[str], edit_ratio: float = 0.01, timeout: float = 120.0):
+    """Time each engine on synthetic files, skipping an engine on larger sizes once it exceeds timeout"""
+    slow = set()
+    for size in sizes:
+        local_lines = synthetic_file(size)
+        new_lines = edited_copy(local_lines, edit_ratio)
+        for engine in engines:
+            if engine in slow:
+                print(f"{size:>9} lines  {engine:<9} skipped, exceeded {timeout:.0f}s on a smaller file")
+                continue
+            start = time.perf_counter()
+            hunks = changed = 0
+            for hunk in iter_hunks(local_lines, new_lines, engine):
+                hunks += 1
+                changed += sum(1 for line in hunk.lines if line[0] != " ")
+            seconds = time.perf_counter() - start
+            if seconds > timeout:
+                slow.add(engine)
+            print(f"{size:>9} lines  {engine:<9} {seconds:8.2f}s  {hunks} hunks, {changed} changed lines")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the merge tool's diff engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Line counts to diff")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--edit-ratio", type=float, default=0.01, help="Fraction of lines changed in the new file")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds after which an engine skips larger sizes")
+    args = parser.parse_args()
+    benchmark(args.sizes, args.engines, args.edit_ratio, args.timeout)
+    sys.exit(0)
@@ -0,0 +1,122 @@
+"""Local load test comparing MCP request throughput across transports.
+
+Starts mcp-sse.py once per transport on a free port, then runs concurrent
+clients that each open one session and read a resource in a loop for a fixed
+time. SSE clients keep their session on the process that opened it, while
+stateless streamable HTTP requests can land on any worker.
+
+    python mcp-src/loadTest.py --clients 32 --duration 10 --workers 4
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from pydantic import AnyUrl
+
+SERVER = Path(__file__).resolve().parent / "mcp-sse.py"
+RESOURCE = AnyUrl("file:///greeting.txt")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on {port} within {timeout}s")
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run_client(transport: str, port: int, deadline: float, latencies: list, errors: list):
+    if transport == "sse":
+        connection = sse_client(f"http://127.0.0.1:{port}/sse")
+    else:
+        connection = streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+    try:
+        async with connection as streams:
+            async with ClientSession(streams[0], streams[1]) as session:
+                await session.initialize()
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        await session.read_resource(RESOURCE)
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(e)
+
+async def measure(transport: str, port: int, clients: int, duration: float) -> dict:
+    latencies, errors = [], []
+    start = time.monotonic()
+    await asyncio.gather(*(run_client(transport, port, start + duration, latencies, errors) for _ in range(clients)))
+    elapsed = time.monotonic() - start
+    return {
+        "requests": len(latencies),
+        "per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": len(errors),
+    }
+
+def run_scenario(transport: str, workers: int, clients: int, duration: float) -> dict:
+    port = free_port()
+    command = [sys.executable, str(SERVER), "--transport", transport, "--port", str(port)]
+    if transport == "streamable-http":
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process)
+        # Give every worker time to finish its own startup
+        time.sleep(0.5 * workers)
+        return asyncio.run(measure(transport, port, clients, duration))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+@click.command()
+@click.option("--clients", default=32, help="Concurrent client sessions")
+@click.option("--duration", default=10.0, help="Seconds each scenario runs")
+@click.option("--workers", default=os.cpu_count() or 2, help="Worker processes for the multi-worker streamable HTTP run")
+def main(clients: int, duration: float, workers: int) -> int:
+    scenarios = [("sse", 1), ("streamable-http", 1)]
+    if workers > 1:
+        scenarios.append(("streamable-http", workers))
+    print(f"{clients} clients reading {RESOURCE} for {duration:.0f}s")
+    for transport, count in scenarios:
+        label = f"{transport} x{count}"
+        try:
+            result = run_scenario(transport, count, clients, duration)
+        except RuntimeError as e:
+            print(f"{label:<22} failed: {e}")
+            continue
+        print(f"{label:<22} {result['per_second']:8.1f} req/s  p50 {result['p50_ms']:6.1f} ms  "
+              f"p99 {result['p99_ms']:6.1f} ms  {result['requests']} ok, {result['errors']} errors")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
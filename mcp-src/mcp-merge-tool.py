@@ -5,25 +5,31 @@ A utility for smartly comparing and merging text files locally.
 """
 
 import argparse
-import difflib
 import sys
 import os
 from enum import Enum
 import re
-from typing import List, Tuple, Dict, Optional
+from typing import Iterable, Iterator, List, Tuple, Dict, Optional
+
+from blockMerge import smart_merge
+from diffEngines import DEFAULT_ENGINE, ENGINES, unified_diff
+from semanticBlocks import BlockIndex, SemanticBlock, language_for_path
+
+HUNK_HEADER = re.compile(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@')
 
 class MergeStrategy(Enum):
-    SMART = "smart"  # Use heuristics to determine best merge
+    SMART = "smart"  # Merge semantic blocks, three-way when a base file is given
     PREFER_LOCAL = "local"  # Prefer local file when conflicts occur
     PREFER_NEW = "new"  # Prefer new content when conflicts occur
     INTERACTIVE = "interactive"  # Prompt user for each conflict
 
 class MergeBlock:
-    def __init__(self, content, source, start_line=None, end_line=None):
+    def __init__(self, content, source, start_line=None, end_line=None, semantic_block: Optional[SemanticBlock] = None):
         self.content = content
         self.source = source  # "local", "new", or "both"
-        self.start_line = start_line
+        self.start_line = start_line  # In the new file for "new" lines, otherwise in the local file
         self.end_line = end_line
+        self.semantic_block = semantic_block  # Innermost function, class or import run holding the line
     
     def __str__(self):
         return f"[{self.source}]: {self.content[:40]}{'...' if len(self.content) > 40 else ''}"
@@ -46,20 +52,20 @@ def write_file(file_path: str, content: str) -> None:
         print(f"Error writing to file {file_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def generate_diff(local_content: str, new_content: str) -> List[str]:
-    """Generate a unified diff between local and new content."""
+def generate_diff(local_content: str, new_content: str, engine: str = DEFAULT_ENGINE) -> Iterator[str]:
+    """Generate a unified diff between local and new content, hunk by hunk."""
     local_lines = local_content.splitlines(keepends=True)
     new_lines = new_content.splitlines(keepends=True)
-    diff = difflib.unified_diff(
-        local_lines, new_lines, 
-        fromfile='local', tofile='new', 
-        n=3  # Context lines
+    return unified_diff(
+        local_lines, new_lines,
+        fromfile='local', tofile='new',
+        engine=engine,
+        context=3  # Context lines
     )
-    return list(diff)
 
 def parse_hunk_header(hunk_header: str) -> Tuple[int, int, int, int]:
     """Parse a hunk header to get line numbers."""
-    match = re.match(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@', hunk_header)
+    match = HUNK_HEADER.match(hunk_header)
     if not match:
         return 0, 0, 0, 0
     
@@ -70,143 +76,74 @@ def parse_hunk_header(hunk_header: str) -> Tuple[int, int, int, int]:
     
     return start1, count1, start2, count2
 
-def identify_semantic_blocks(content: str) -> List[dict]:
-    """
-    Identify semantic blocks in content (functions, classes, methods, etc.).
-    Returns a list of dictionaries with start_line, end_line, type, and name.
-    """
-    blocks = []
-    lines = content.splitlines()
-    
-    # Simple patterns for identifying code blocks
-    patterns = {
-        'function': r'^\s*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)\s*:',
-        'class': r'^\s*class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:\(.*\))?\s*:',
-        'method': r'^\s+def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*\)\s*:',
-        'comment_block': r'^\s*#.*',
-        'docstring': r'^\s*"""',
-        'imports': r'^\s*(?:import|from)\s+.*',
-    }
-    
-    current_block = None
-    indentation_stack = []
-    
-    for i, line in enumerate(lines):
-        line_num = i + 1
-        
-        # Skip empty lines
-        if not line.strip():
-            continue
-        
-        # Calculate indentation level
-        indentation = len(line) - len(line.lstrip())
-        
-        # Check if we're closing blocks due to dedentation
-        while indentation_stack and indentation < indentation_stack[-1]:
-            if current_block and 'end_line' not in current_block:
-                current_block['end_line'] = line_num - 1
-                blocks.append(current_block)
-                current_block = None
-            indentation_stack.pop()
-        
-        # Check for new block starts
-        for block_type, pattern in patterns.items():
-            match = re.match(pattern, line)
-            if match:
-                if block_type in ['function', 'class', 'method']:
-                    if current_block and 'end_line' not in current_block:
-                        current_block['end_line'] = line_num - 1
-                        blocks.append(current_block)
-                    
-                    name = match.group(1) if match.groups() else None
-                    current_block = {
-                        'start_line': line_num,
-                        'type': block_type,
-                        'name': name
-                    }
-                    indentation_stack.append(indentation)
-                    break
-    
-    # Close any remaining open blocks
-    if current_block and 'end_line' not in current_block:
-        current_block['end_line'] = len(lines)
-        blocks.append(current_block)
-    
-    return blocks
-
-def analyze_changes(diff_lines: List[str], local_content: str, new_content: str) -> List[MergeBlock]:
+def analyze_changes(diff_lines: Iterable[str], local_content: str, new_content: str,
+                    local_index: Optional[BlockIndex] = None, new_index: Optional[BlockIndex] = None) -> List[MergeBlock]:
     """
     Analyze diff to create merge blocks with smart decisions.
+    Each merge block is tagged with its line number and semantic block, from
+    indexes built once per file and shared with apply_merge_strategy.
     """
-    local_lines = local_content.splitlines()
-    new_lines = new_content.splitlines()
-    
-    # Identify semantic blocks
-    local_blocks = identify_semantic_blocks(local_content)
-    new_blocks = identify_semantic_blocks(new_content)
+    local_index = local_index or BlockIndex.build(local_content)
+    new_index = new_index or BlockIndex.build(new_content)
     
     merge_blocks = []
     current_hunk = None
+    local_line = new_line = 0
     
     for line in diff_lines:
         if line.startswith('@@'):
             # New hunk
             current_hunk = line
             local_start, local_count, new_start, new_count = parse_hunk_header(line)
+            # An empty range names the line before it
+            local_line = local_start if local_count else local_start + 1
+            new_line = new_start if new_count else new_start + 1
+        elif current_hunk is None:
+            # The ---/+++ file headers
+            continue
         elif line.startswith('-'):
             # Line removed (exists in local but not in new)
             content = line[1:]
-            merge_blocks.append(MergeBlock(content, "local"))
+            merge_blocks.append(MergeBlock(content, "local", local_line, local_line, local_index.block_at(local_line)))
+            local_line += 1
         elif line.startswith('+'):
             # Line added (exists in new but not in local)
             content = line[1:]
-            merge_blocks.append(MergeBlock(content, "new"))
+            merge_blocks.append(MergeBlock(content, "new", new_line, new_line, new_index.block_at(new_line)))
+            new_line += 1
         elif line.startswith(' '):
             # Context line (exists in both)
             content = line[1:]
-            merge_blocks.append(MergeBlock(content, "both"))
+            merge_blocks.append(MergeBlock(content, "both", local_line, local_line, local_index.block_at(local_line)))
+            local_line += 1
+            new_line += 1
     
     return merge_blocks
 
-def apply_merge_strategy(merge_blocks: List[MergeBlock], strategy: MergeStrategy, local_content: str, new_content: str) -> str:
+def apply_merge_strategy(merge_blocks: List[MergeBlock], strategy: MergeStrategy, local_content: str, new_content: str,
+                         local_index: Optional[BlockIndex] = None, new_index: Optional[BlockIndex] = None,
+                         base_content: Optional[str] = None, base_index: Optional[BlockIndex] = None,
+                         engine: str = DEFAULT_ENGINE) -> str:
     """
     Apply the selected merge strategy to create the merged content.
+    The smart strategy works from the file contents and their block indexes;
+    base_content, the common ancestor of both, makes it a three-way merge.
     """
     merged_content = []
     
     if strategy == MergeStrategy.SMART:
-        # Implement smart merge logic
-        local_blocks = identify_semantic_blocks(local_content)
-        new_blocks = identify_semantic_blocks(new_content)
-        
-        # Map of block names to their content (for both local and new)
-        local_block_map = {block['name']: (block['start_line'], block['end_line']) 
-                           for block in local_blocks if 'name' in block}
-        new_block_map = {block['name']: (block['start_line'], block['end_line']) 
-                         for block in new_blocks if 'name' in block}
-        
-        # Find blocks that exist in both
-        common_blocks = set(local_block_map.keys()) & set(new_block_map.keys())
-        local_only_blocks = set(local_block_map.keys()) - set(new_block_map.keys())
-        new_only_blocks = set(new_block_map.keys()) - set(local_block_map.keys())
-        
-        # Build merged content by going through merge blocks
-        for block in merge_blocks:
-            if block.source == "both":
-                merged_content.append(block.content)
-            elif block.source == "local" and strategy == MergeStrategy.PREFER_LOCAL:
-                merged_content.append(block.content)
-            elif block.source == "new" and strategy == MergeStrategy.PREFER_NEW:
-                merged_content.append(block.content)
-            else:
-                # For smart strategy, we need more context
-                if block.source == "local":
-                    # Check if this is part of a block that was completely replaced
-                    # For now, default to keeping local version in ambiguous cases
-                    merged_content.append(block.content)
-                elif block.source == "new":
-                    # Prefer new content for additions unless it conflicts with local
-                    merged_content.append(block.content)
+        # Merge whole functions, methods and import runs, three-way when there is a base
+        base_lines = base_content.splitlines() if base_content is not None else None
+        result = smart_merge(local_content.splitlines(), new_content.splitlines(), base_lines,
+                             local_index, new_index, base_index, engine)
+        if result.conflicts:
+            print(f"{result.conflicts} conflict(s) marked in the merged content", file=sys.stderr)
+        if result.replaced:
+            print(f"{len(result.replaced)} local unit(s) replaced by new without a base: {', '.join(result.replaced)}",
+                  file=sys.stderr)
+        merged_content = result.lines
+        if local_content.endswith("\n"):
+            merged_content.append("")
     
     elif strategy == MergeStrategy.PREFER_LOCAL:
         for block in merge_blocks:
@@ -282,7 +219,8 @@ def apply_merge_strategy(merge_blocks: List[MergeBlock], strategy: MergeStrategy
     
     return "\n".join(merged_content)
 
-def compare_files(local_path: str, new_content: str, strategy: MergeStrategy, output_path: Optional[str] = None) -> str:
+def compare_files(local_path: str, new_content: str, strategy: MergeStrategy, output_path: Optional[str] = None,
+                  engine: str = DEFAULT_ENGINE, base_path: Optional[str] = None) -> str:
     """
     Compare and merge two files based on the selected strategy.
     
@@ -291,25 +229,39 @@ def compare_files(local_path: str, new_content: str, strategy: MergeStrategy, ou
         new_content: Content string to compare with (from LLM or other source)
         strategy: Merge strategy to apply
         output_path: Optional path to write merged content
+        engine: Diff engine, one of diffEngines.ENGINES
+        base_path: Optional common ancestor of both, for a three-way smart merge
         
     Returns:
         Merged content as a string
     """
     local_content = read_file(local_path)
     
-    # Generate diff
-    diff_lines = generate_diff(local_content, new_content)
+    # Index semantic blocks once, every merge stage looks lines up in these
+    language = language_for_path(local_path)
+    local_index = BlockIndex.build(local_content, language)
+    new_index = BlockIndex.build(new_content, language)
+    base_content = base_index = None
+    if base_path:
+        base_content = read_file(base_path)
+        base_index = BlockIndex.build(base_content, language)
     
     # If there are no differences, return the local content
-    if not diff_lines or len(diff_lines) <= 2:  # Just headers
+    if local_content == new_content:
         print("No differences found.")
         return local_content
     
-    # Analyze changes to create merge blocks
-    merge_blocks = analyze_changes(diff_lines, local_content, new_content)
+    if strategy == MergeStrategy.SMART:
+        # The smart merge only diffs the blocks that changed
+        merge_blocks = []
+    else:
+        # Analyze changes to create merge blocks
+        diff_lines = generate_diff(local_content, new_content, engine)
+        merge_blocks = analyze_changes(diff_lines, local_content, new_content, local_index, new_index)
     
     # Apply merge strategy
-    merged_content = apply_merge_strategy(merge_blocks, strategy, local_content, new_content)
+    merged_content = apply_merge_strategy(merge_blocks, strategy, local_content, new_content, local_index, new_index,
+                                          base_content, base_index, engine)
     
     # Write to output file if specified
     if output_path:
@@ -333,7 +285,19 @@ def main():
         "--strategy", 
         choices=[s.value for s in MergeStrategy], 
         default=MergeStrategy.SMART.value,
-        help="Merge strategy to apply"
+        help="Merge strategy to apply. Without --base-file, smart takes new for every unit both sides have, "
+             "so local edits to them are replaced (and listed on stderr), and keeps units only local has, "
+             "so deletions in new are not applied"
+    )
+    parser.add_argument(
+        "--base-file",
+        help="Common ancestor of the local and new file, makes the smart strategy a three-way merge"
+    )
+    parser.add_argument(
+        "--diff-engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help="Diff algorithm: difflib, myers (linear space) or patience"
     )
     parser.add_argument(
         "-o", "--output", 
@@ -364,17 +328,17 @@ def main():
     # Generate diff if requested
     if args.diff_only:
         local_content = read_file(args.local_file)
-        diff_lines = generate_diff(local_content, new_content)
-        print("".join(diff_lines))
+        diff_lines = generate_diff(local_content, new_content, args.diff_engine)
+        sys.stdout.writelines(diff_lines)
         return
     
     # Perform the merge
     strategy = MergeStrategy(args.strategy)
-    merged_content = compare_files(args.local_file, new_content, strategy, args.output)
+    merged_content = compare_files(args.local_file, new_content, strategy, args.output, args.diff_engine, args.base_file)
     
     # Print to stdout if no output file specified
     if not args.output:
-        print(merged_content)
+        print(merged_content, end="" if merged_content.endswith("\n") else "\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
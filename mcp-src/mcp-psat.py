@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import click
+from mcp.server.fastmcp import Context, FastMCP
+
+# The generator lives in src/ next to this folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ai.agent.utils.Cancellation import CancellationToken
+from ai.models.psatModel import QuestionModel
+from ai.ui.utils.psatUtils import ScoreCounter
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.WARNING,
+    stream=sys.stderr
+)
+logger = logging.getLogger("mcp-psat")
+
+PAPERS_DIR = os.getenv("PSAT_PAPERS_DIR", "contents/papers")
+# Question papers generated at once, further calls wait for a slot
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("PSAT_MAX_CONCURRENT_GENERATIONS", "2"))
+PROGRESS_INTERVAL = 2.0
+WORD = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> list:
+    return WORD.findall(text.lower())
+
+class QuestionBank:
+    """Question papers saved as JSON files, with an inverted index of their question words.
+
+    Papers are indexed once when loaded or added, so a search only touches the
+    questions that contain one of the query words.
+    """
+    def __init__(self, papers_dir: str = PAPERS_DIR):
+        self.papers_dir = papers_dir
+        self.papers = {}  # paper id -> paper dict
+        self.questions = {}  # (paper id, question id) -> question dict
+        self.index = defaultdict(dict)  # word -> {(paper id, question id): occurrences}
+        self._lock = threading.Lock()
+        os.makedirs(papers_dir, exist_ok=True)
+        for file_name in sorted(os.listdir(papers_dir)):
+            if file_name.endswith(".json"):
+                try:
+                    with open(os.path.join(papers_dir, file_name), encoding="utf-8") as f:
+                        self._index_paper(json.load(f))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable paper {file_name}: {e}")
+
+    def _index_paper(self, paper: dict):
+        with self._lock:
+            self.papers[paper["paper_id"]] = paper
+            for question in paper["questions"]:
+                text = " ".join([question["question_text"], question["explanation"]] +
+                                [choice["value"] for choice in question["choices"]])
+                key = (paper["paper_id"], question["question_id"])
+                self.questions[key] = question
+                for word in tokenize(text):
+                    self.index[word][key] = self.index[word].get(key, 0) + 1
+
+    def add_paper(self, prompt: str, questions: list) -> dict:
+        """Save a generated paper and add its questions to the index"""
+        paper = {
+            "paper_id": uuid.uuid4().hex[:12],
+            "title": prompt.strip().splitlines()[0][:80],
+            "prompt": prompt,
+            "created": time.time(),
+            "questions": [question.to_dict() for question in questions],
+        }
+        path = os.path.join(self.papers_dir, f"{paper['paper_id']}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(paper, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        self._index_paper(paper)
+        return paper
+
+    def get_paper(self, paper_id: str) -> dict:
+        paper = self.papers.get(paper_id)
+        if paper is None:
+            raise ValueError(f"Unknown paper: {paper_id}")
+        return paper
+
+    def list_papers(self) -> list:
+        return [
+            {"paper_id": paper["paper_id"], "title": paper["title"], "questions": len(paper["questions"]), "created": paper["created"]}
+            for paper in sorted(self.papers.values(), key=lambda paper: paper["created"], reverse=True)
+        ]
+
+    def search(self, query: str, topic: str = None, limit: int = 10) -> list:
+        """Rank questions by how many query words they contain, then by occurrences"""
+        scores = defaultdict(lambda: [0, 0])
+        with self._lock:
+            for word in set(tokenize(query)):
+                for key, count in self.index.get(word, {}).items():
+                    scores[key][0] += 1
+                    scores[key][1] += count
+        results = []
+        for key, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            question = self.questions[key]
+            if topic and (question.get("topic") or "").lower() != topic.lower():
+                continue
+            results.append({"paper_id": key[0], "score": score[0], **question})
+            if len(results) >= limit:
+                break
+        return results
+
+def to_question_models(content) -> list:
+    """Validate the agent response into QuestionModel objects numbered from 1"""
+    if isinstance(content, dict):
+        # Some models wrap the list, e.g. {"questions": [...]}
+        content = next((value for value in content.values() if isinstance(value, list)), [content])
+    questions = []
+    for number, item in enumerate(content, 1):
+        item = dict(item, question_id=number)
+        item.setdefault("question_text", item.pop("question", ""))
+        questions.append(QuestionModel.model_validate(item))
+    return questions
+
+server = FastMCP("mcp-psat", log_level="ERROR")
+bank = None
+generation_slots = None
+_question_agent = None
+_agent_lock = threading.Lock()
+
+def get_bank() -> QuestionBank:
+    global bank
+    if bank is None:
+        bank = QuestionBank()
+    return bank
+
+def get_question_agent():
+    global _question_agent
+    with _agent_lock:
+        if _question_agent is None:
+            from ai.agent.QuestionAgent import SystemAgent as QuestionAgent
+
+            _question_agent = QuestionAgent()
+        return _question_agent
+
+async def report(ctx: Context, progress: float, total: float = None, message: str = None):
+    # Progress is only sent when the client asked for it with a progress token
+    try:
+        await ctx.report_progress(progress, total, message)
+    except Exception as e:
+        logger.debug(f"Progress notification failed: {e}")
+
+@server.tool(name="generate_question_paper", description="Generate a multiple choice question paper from a prompt and save it to the question bank")
+async def generate_question_paper(prompt: str, ctx: Context) -> dict:
+    """Generate a question paper
+
+    Args:
+        prompt (str): What the paper should cover, e.g. "5 questions on friction"
+
+    Returns:
+        dict: The saved paper with its paper_id and questions
+    """
+    global generation_slots
+    if generation_slots is None:
+        generation_slots = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+    await report(ctx, 0, 3, "Waiting for a generation slot")
+    async with generation_slots:
+        await report(ctx, 1, 3, "Generating questions")
+        cancel_token = CancellationToken()
+        loop = asyncio.get_running_loop()
+        generation = loop.run_in_executor(None, lambda: get_question_agent().executeQuery(prompt, cancel_token))
+        start = time.perf_counter()
+        try:
+            while True:
+                done, _ = await asyncio.wait({generation}, timeout=PROGRESS_INTERVAL)
+                if done:
+                    break
+                await report(ctx, 1, 3, f"Generating questions ({time.perf_counter() - start:.0f}s)")
+            response = generation.result()
+        except asyncio.CancelledError:
+            # The client cancelled the call, stop the LLM stream too
+            cancel_token.cancel()
+            raise
+
+    await report(ctx, 2, 3, "Validating questions")
+    questions = to_question_models(response.content)
+    paper = await asyncio.to_thread(get_bank().add_paper, prompt, questions)
+    await report(ctx, 3, 3, f"Saved paper {paper['paper_id']}")
+    return paper
+
+@server.tool(name="score_answers", description="Score answers to a saved question paper, overall and per topic")
+async def score_answers(paper_id: str, answers: dict[str, str]) -> dict:
+    """Score answers
+
+    Args:
+        paper_id (str): Paper returned by generate_question_paper
+        answers (dict): Selected choice key (a-d) by question id, e.g. {"1": "a", "2": "c"}
+
+    Returns:
+        dict: Score summary and the result of each question
+    """
+    paper = get_bank().get_paper(paper_id)
+    questions = []
+    for item in paper["questions"]:
+        question = QuestionModel.model_validate(item)
+        selected = answers.get(str(question.question_id))
+        question.selected_choice = selected.lower() if selected and selected.lower() in ("a", "b", "c", "d") else None
+        questions.append(question)
+    summary = ScoreCounter(questions).summary()
+    summary["percentage"] = round(100 * summary["correct"] / summary["total"], 1) if summary["total"] else 0.0
+    summary["results"] = [
+        {
+            "question_id": question.question_id,
+            "selected": question.selected_choice,
+            "correct_answer": question.correct_answer,
+            "is_correct": question.is_correct(),
+            "explanation": question.explanation,
+        }
+        for question in questions
+    ]
+    return summary
+
+@server.tool(name="search_questions", description="Search the question bank of saved papers")
+async def search_questions(query: str, topic: str | None = None, limit: int = 10) -> list:
+    """Search questions
+
+    Args:
+        query (str): Words to look for in questions, choices and explanations
+        topic (str): Only return questions of this topic
+        limit (int): Maximum number of questions
+
+    Returns:
+        list: Matching questions, best first, with their paper_id
+    """
+    return get_bank().search(query, topic, limit)
+
+@server.resource(uri="psat://papers", name="papers", description="Saved question papers, newest first", mime_type="application/json")
+def listPapers():
+    return json.dumps(get_bank().list_papers())
+
+@server.resource(uri="psat://papers/{paper_id}", name="paper", description="A saved question paper", mime_type="application/json")
+def getPaper(paper_id: str):
+    return json.dumps(get_bank().get_paper(paper_id))
+
+@click.command()
+@click.option("--port", default=8000, help="Port to listen on for SSE")
+@click.option(
+    "--transport",
+    type=click.Choice(["stdio", "sse"]),
+    default="stdio",
+    help="Transport type",
+)
+def main(port: int, transport: str) -> int:
+    server.settings.port = port
+    server.run(transport=transport)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,81 +3,266 @@ import click
 import mcp.types as types
 from mcp.server.lowlevel import Server
 from pydantic import FileUrl
+from pathlib import Path
+import os
 import sys
+from resourceProvider import FileResourceProvider, ResourceNotifier, initialization_options
+from serverMetrics import ServerMetrics
 
-SAMPLE_RESOURCES = {
-    "greeting": "Hello! This is a sample text resource.",
-    "help": "This server provides a few sample text resources for testing.",
-    "about": "This is the simple-resource MCP server implementation.",
-}
+RESOURCES_DIR = Path(__file__).resolve().parent / "resources"
 
 
-@click.command()
-@click.option("--port", default=8000, help="Port to listen on for SSE")
-@click.option(
-    "--transport",
-    type=click.Choice(["stdio", "sse"]),
-    default="stdio",
-    help="Transport type",
-)
-def main(port: int, transport: str) -> int:
+def create_server(resources_dir: str = str(RESOURCES_DIR)):
+    """Low-level server listing and reading the files under resources_dir, and its notifier"""
     app = Server("mcp-simple-resource")
+    provider = FileResourceProvider(resources_dir)
+    notifier = ResourceNotifier(provider, lambda name: f"file:///{name}")
+    notifier.register(app)
 
     @app.list_resources()
     async def list_resources() -> list[types.Resource]:
+        notifier.track(app.request_context.session)
         return [
             types.Resource(
-                uri=FileUrl(f"file:///{name}.txt"),
-                name=name,
-                description=f"A sample text resource named {name}",
-                mimeType="text/plain",
+                uri=FileUrl(f"file:///{entry.name}"),
+                name=entry.name,
+                description=f"A {entry.mime_type} resource named {entry.name}",
+                mimeType=entry.mime_type,
+                size=entry.size,
             )
-            for name in SAMPLE_RESOURCES.keys()
+            for entry in provider.entries()
         ]
 
     @app.read_resource()
     async def read_resource(uri: FileUrl) -> str | bytes:
-        name = uri.path.replace(".txt", "").lstrip("/")
+        name = uri.path.lstrip("/")
+        # Cached reads return at once, others may touch the disk
+        return await anyio.to_thread.run_sync(provider.read, name)
 
-        if name not in SAMPLE_RESOURCES:
-            raise ValueError(f"Unknown resource: {uri}")
+    return app, notifier
 
-        return SAMPLE_RESOURCES[name]
 
-    if transport == "sse":
-        from mcp.server.sse import SseServerTransport
-        from starlette.applications import Starlette
-        from starlette.routing import Mount, Route
+def create_sse_app(app: Server, notifier: ResourceNotifier, max_sessions: int = 100, max_pending: int = 32,
+                   debug: bool = False):
+    """Starlette app serving app over SSE to many clients.
 
-        sse = SseServerTransport("/messages/")
+    At most max_sessions SSE sessions are open at once, each with at most
+    max_pending posted messages waiting to be read by the server; beyond
+    either limit clients get 503 or 429 with Retry-After. app.state.drain()
+    stops new sessions, waits for requests in flight and then closes the open
+    streams.
+    """
+    from collections import defaultdict
+    from contextlib import asynccontextmanager
+    from urllib.parse import parse_qs
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse, Response
+    from starlette.routing import Mount, Route
 
-        async def handle_sse(request):
-            async with sse.connect_sse(
-                request.scope, request.receive, request._send
-            ) as streams:
-                await app.run(
-                    streams[0], streams[1], app.create_initialization_options()
-                )
+    sse = SseServerTransport("/messages/")
+    metrics = ServerMetrics("mcp_sse")
+    metrics.instrument(app)
+    pending = defaultdict(int)  # session id -> posted messages not yet read by the server
+    session_scopes = set()
+    draining = anyio.Event()
+
+    async def handle_sse(request):
+        if draining.is_set() or metrics.sessions_open >= max_sessions:
+            metrics.sessions_rejected += 1
+            return PlainTextResponse("Too many sessions", status_code=503, headers={"Retry-After": "5"})
+        metrics.session_opened()
+        try:
+            with anyio.CancelScope() as scope:
+                session_scopes.add(scope)
+                async with sse.connect_sse(
+                    request.scope, request.receive, request._send
+                ) as streams:
+                    await app.run(
+                        streams[0], streams[1], initialization_options(app)
+                    )
+        finally:
+            session_scopes.discard(scope)
+            metrics.session_closed()
+        return Response()
+
+    async def handle_messages(scope, receive, send):
+        session_id = parse_qs(scope.get("query_string", b"").decode()).get("session_id", [""])[0]
+        if pending[session_id] >= max_pending:
+            # The server is not keeping up with this session, make the client slow down
+            metrics.messages_rejected += 1
+            response = PlainTextResponse("Too many pending messages", status_code=429, headers={"Retry-After": "1"})
+            return await response(scope, receive, send)
+        pending[session_id] += 1
+        metrics.messages.add()
+        try:
+            await sse.handle_post_message(scope, receive, send)
+        finally:
+            pending[session_id] -= 1
+            if not pending[session_id]:
+                del pending[session_id]
+
+    async def handle_metrics(request):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    async def drain(timeout: float = 30):
+        draining.set()
+        with anyio.move_on_after(timeout):
+            while metrics.requests_in_flight or pending:
+                await anyio.sleep(0.1)
+        for scope in list(session_scopes):
+            scope.cancel()
+
+    @asynccontextmanager
+    async def lifespan(starlette_app):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(notifier.run)
+            yield
+            tg.cancel_scope.cancel()
+
+    starlette_app = Starlette(
+        debug=debug,
+        routes=[
+            Route("/sse", endpoint=handle_sse),
+            Route("/metrics", endpoint=handle_metrics),
+            Mount("/messages/", app=handle_messages),
+        ],
+        lifespan=lifespan,
+    )
+    starlette_app.state.metrics = metrics
+    starlette_app.state.drain = drain
+    return starlette_app
+
+
+def create_streamable_http_app(app: Server, notifier: ResourceNotifier = None, debug: bool = False):
+    """Starlette app serving app over stateless streamable HTTP at /mcp.
+
+    Every POST is answered with a plain JSON response by a throwaway session,
+    so no state outlives a request and any worker process can serve any call;
+    this is what lets a load balancer spread requests without sticky sessions.
+    The price is that there is no long-lived stream to push resource change
+    notifications on; notifier still polls so listings stay current, but its
+    subscribers are gone as soon as their request is answered.
+    """
+    from contextlib import asynccontextmanager
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    session_manager = StreamableHTTPSessionManager(app=app, json_response=True, stateless=True)
+    metrics = ServerMetrics("mcp_http")
+    metrics.instrument(app)
+
+    class StreamableHTTPEndpoint:
+        # A class instance, so that Route passes the raw ASGI call through
+        async def __call__(self, scope, receive, send):
+            metrics.messages.add()
+            await session_manager.handle_request(scope, receive, send)
+
+    async def handle_metrics(request):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-        starlette_app = Starlette(
-            debug=True,
-            routes=[
-                Route("/sse", endpoint=handle_sse),
-                Mount("/messages/", app=sse.handle_post_message),
-            ],
-        )
+    @asynccontextmanager
+    async def lifespan(starlette_app):
+        async with session_manager.run(), anyio.create_task_group() as tg:
+            if notifier is not None:
+                tg.start_soon(notifier.run)
+            yield
+            tg.cancel_scope.cancel()
 
+    starlette_app = Starlette(
+        debug=debug,
+        routes=[
+            Route("/mcp", endpoint=StreamableHTTPEndpoint(), methods=["GET", "POST", "DELETE"]),
+            Route("/metrics", endpoint=handle_metrics),
+        ],
+        lifespan=lifespan,
+    )
+    starlette_app.state.metrics = metrics
+    return starlette_app
+
+
+def streamable_http_app():
+    """App factory for uvicorn worker processes, configured from the environment"""
+    app, notifier = create_server(os.getenv("MCP_RESOURCES_DIR", str(RESOURCES_DIR)))
+    return create_streamable_http_app(app, notifier, os.getenv("MCP_DEBUG") == "1")
+
+
+def serve_with_drain(starlette_app, port: int, drain_timeout: float):
+    """Run uvicorn, draining sessions on the first SIGINT/SIGTERM and exiting on the second"""
+    import asyncio
+    import uvicorn
+
+    class DrainingServer(uvicorn.Server):
+        draining = False
+
+        def handle_exit(self, sig, frame):
+            if self.draining:
+                return super().handle_exit(sig, frame)
+            self.draining = True
+
+            async def drain_and_exit():
+                await starlette_app.state.drain(drain_timeout)
+                super(DrainingServer, self).handle_exit(sig, frame)
+
+            asyncio.get_event_loop().call_soon_threadsafe(lambda: asyncio.ensure_future(drain_and_exit()))
+
+    config = uvicorn.Config(starlette_app, host="0.0.0.0", port=port, timeout_graceful_shutdown=drain_timeout)
+    DrainingServer(config).run()
+
+
+@click.command()
+@click.option("--port", default=8000, help="Port to listen on for SSE or streamable HTTP")
+@click.option(
+    "--transport",
+    type=click.Choice(["stdio", "sse", "streamable-http"]),
+    default="stdio",
+    help="Transport type",
+)
+@click.option("--max-sessions", default=100, help="Open SSE sessions before new ones get 503")
+@click.option("--max-pending", default=32, help="Unread messages per session before posts get 429")
+@click.option("--heartbeat", default=15.0, help="Seconds between SSE pings on idle streams")
+@click.option("--drain-timeout", default=30.0, help="Seconds to wait for requests in flight on shutdown")
+@click.option("--debug", is_flag=True, help="Starlette debug mode")
+@click.option("--resources-dir", default=str(RESOURCES_DIR), help="Directory of files served as resources")
+@click.option("--workers", default=1, help="Worker processes for streamable HTTP")
+def main(port: int, transport: str, max_sessions: int, max_pending: int, heartbeat: float,
+         drain_timeout: float, debug: bool, resources_dir: str, workers: int) -> int:
+    if transport == "streamable-http":
         import uvicorn
 
-        uvicorn.run(starlette_app, host="0.0.0.0", port=port)
+        if workers > 1:
+            # Each worker imports this module and builds its own server from the environment
+            os.environ["MCP_RESOURCES_DIR"] = resources_dir
+            os.environ["MCP_DEBUG"] = "1" if debug else "0"
+            uvicorn.run(f"{Path(__file__).stem}:streamable_http_app", factory=True, host="0.0.0.0", port=port,
+                        workers=workers, timeout_graceful_shutdown=drain_timeout)
+        else:
+            app, notifier = create_server(resources_dir)
+            uvicorn.run(create_streamable_http_app(app, notifier, debug), host="0.0.0.0", port=port,
+                        timeout_graceful_shutdown=drain_timeout)
+        return 0
+
+    app, notifier = create_server(resources_dir)
+    if transport == "sse":
+        from sse_starlette.sse import EventSourceResponse
+
+        # SseServerTransport has no ping parameter, so the interval can only be
+        # set process wide on the class it creates its responses from
+        EventSourceResponse.DEFAULT_PING_INTERVAL = heartbeat
+        starlette_app = create_sse_app(app, notifier, max_sessions, max_pending, debug)
+        serve_with_drain(starlette_app, port, drain_timeout)
     else:
         from mcp.server.stdio import stdio_server
 
         async def arun():
-            async with stdio_server() as streams:
+            async with stdio_server() as streams, anyio.create_task_group() as tg:
+                tg.start_soon(notifier.run)
                 await app.run(
-                    streams[0], streams[1], app.create_initialization_options()
+                    streams[0], streams[1], initialization_options(app)
                 )
+                tg.cancel_scope.cancel()
 
         anyio.run(arun)
 
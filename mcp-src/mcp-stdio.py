@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
 import logging
+import os
+import sys
+import time
+import click
+import httpx
 from mcp.server.fastmcp import FastMCP
+from pathlib import Path
 from random import random
 import base64
-import requests
+from resourceProvider import FileResourceProvider, ResourceNotifier, initialization_options
 
 logging.basicConfig(
     filename='/home/kira/mcp_server.log',
@@ -76,6 +84,11 @@ def echo(message):
     
     return f"{message}: Random Number: {random()}"
 
+# Files of the working directory served under resource://data/, read through an mtime-validated cache
+data_files = FileResourceProvider(".", include=["secret.txt"], recursive=False)
+data_notifier = ResourceNotifier(data_files, lambda name: f"resource://data/{name}")
+data_notifier.register(server._mcp_server)
+
 @server.resource("resource://data/secret.txt")
 def getSecret():
     """Get the secret message
@@ -83,8 +96,75 @@ def getSecret():
     Returns:
         str: The secret message
     """
-    with open("secret.txt", "r") as f:
-        return f.read()
+    return data_files.read_text("secret.txt")
+
+class CachedJSONResource:
+    """JSON document fetched over a shared pooled HTTP client and cached for ttl seconds.
+
+    Concurrent readers of an expired entry wait for a single request. The
+    server's ETag is sent back with If-None-Match; servers without ETags are
+    compared by a digest of the body, so an unchanged document keeps its
+    parsed value and version.
+    """
+    def __init__(self, url: str, ttl: float = 5.0, timeout: float = 5.0):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.value = None
+        self.version = 0  # Incremented whenever the document changes
+        self.etag = None
+        self.digest = None
+        self.fetched_at = 0.0
+        self._client = None
+        self._lock = None
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+        return self._client
+
+    async def get(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self.value is not None and time.monotonic() - self.fetched_at < self.ttl:
+            return self.value
+        async with self._lock:
+            # Another reader may have refreshed it while this one waited
+            if self.value is not None and time.monotonic() - self.fetched_at < self.ttl:
+                return self.value
+            try:
+                await self._refresh()
+            except (httpx.HTTPError, ValueError) as e:
+                if self.value is None:
+                    raise
+                logging.warning(f"Serving stale {self.url}: {e}")
+                self.fetched_at = time.monotonic()
+            return self.value
+
+    async def _refresh(self):
+        headers = {"If-None-Match": self.etag} if self.etag and self.value is not None else {}
+        response = await self.client().get(self.url, headers=headers)
+        self.fetched_at = time.monotonic()
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        digest = hashlib.sha256(response.content).hexdigest()
+        self.etag = response.headers.get("etag")
+        if digest != self.digest:
+            self.value = response.json()
+            self.digest = digest
+            self.version += 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# OLLAMA_HOST points listModels at another server, e.g. a local stub
+ollama_models = CachedJSONResource(f"{os.getenv('OLLAMA_HOST', 'http://localhost:11434').rstrip('/')}/api/tags")
 
 @server.resource(uri="resource://ollama/listModels", name="listModels", description="List all available models", mime_type="application/json")
 async def listModels():
@@ -93,10 +173,7 @@ async def listModels():
     Returns:
         list: List of available models
     """
-    # http://localhost:11434/api/tags
-    url = "http://localhost:11434/api/tags"
-    response = requests.get(url)
-    return response.json()
+    return await ollama_models.get()
 
 @server.prompt(name="samplePrompt", description="Prompt the user for input")
 async def samplePrompt(message):
@@ -107,7 +184,40 @@ async def samplePrompt(message):
     """
     return "Enter a value: "+ message
 
-if __name__ == "__main__":
+def streamable_http_app():
+    """Stateless streamable HTTP app, also the factory run by each uvicorn worker"""
+    # JSON responses from a throwaway session per request, so any worker can serve any call
+    server.settings.stateless_http = True
+    server.settings.json_response = True
+    return server.streamable_http_app()
+
+@click.command()
+@click.option("--transport", type=click.Choice(["stdio", "streamable-http"]), default="stdio", help="Transport type")
+@click.option("--port", default=8000, help="Port to listen on for streamable HTTP")
+@click.option("--workers", default=1, help="Worker processes for streamable HTTP")
+def main(transport: str, port: int, workers: int) -> int:
+    if transport == "streamable-http":
+        import uvicorn
+
+        if workers > 1:
+            uvicorn.run(f"{Path(__file__).stem}:streamable_http_app", factory=True, host="0.0.0.0", port=port, workers=workers)
+        else:
+            uvicorn.run(streamable_http_app(), host="0.0.0.0", port=port)
+        return 0
+
+    import anyio
+    from mcp.server.stdio import stdio_server
+
+    async def arun():
+        # Same as server.run(transport="stdio"), plus change notifications for data files
+        async with stdio_server() as streams, anyio.create_task_group() as tg:
+            tg.start_soon(data_notifier.run)
+            await server._mcp_server.run(streams[0], streams[1], initialization_options(server._mcp_server))
+            tg.cancel_scope.cancel()
+
     # Start the server
-    server.run(transport="stdio")  # Based on the methods list, 'run' appears to be the correct method
+    anyio.run(arun)
+    return 0
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""File-backed MCP resources shared by the MCP servers in this folder."""
+import fnmatch
+import logging
+import mimetypes
+import os
+import threading
+import weakref
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import anyio
+from mcp.server.lowlevel import NotificationOptions, Server
+from pydantic import AnyUrl
+
+logger = logging.getLogger(__name__)
+
+TEXT_MIME_TYPES = {"application/json", "application/xml", "application/yaml", "application/x-yaml", "application/javascript"}
+
+@dataclass
+class FileEntry:
+    name: str  # Path relative to the provider root, with / separators
+    path: str
+    size: int
+    mtime_ns: int
+    mime_type: str
+
+    @property
+    def is_text(self) -> bool:
+        return self.mime_type.startswith("text/") or self.mime_type in TEXT_MIME_TYPES
+
+class FileResourceProvider:
+    """Files under root served as resources.
+
+    Files up to max_cached_file bytes are kept in an LRU cache of at most
+    max_cache_bytes, validated against the file's mtime and size on every read.
+    Larger files are read from disk every time. Hidden files and directories
+    are never served. poll_changes() compares the tree with the previous poll
+    so servers can notify their clients.
+    """
+    def __init__(self, root: str, include: List[str] = None, recursive: bool = True,
+                 max_cache_bytes: int = 16 * 1024 * 1024, max_cached_file: int = 1024 * 1024):
+        self.root = os.path.realpath(root)
+        self.include = include or ["*"]
+        self.recursive = recursive
+        self.max_cache_bytes = max_cache_bytes
+        self.max_cached_file = max_cached_file
+        self.cache_bytes = 0
+        self._cache = OrderedDict()  # name -> (mtime_ns, size, data), least recently used first
+        self._lock = threading.Lock()
+        self._snapshot: Dict[str, FileEntry] = self.scan()
+
+    def scan(self) -> Dict[str, FileEntry]:
+        """Stat the files under root that match include"""
+        entries = {}
+        if not os.path.isdir(self.root):
+            return entries
+        pending = [self.root]
+        while pending:
+            directory = pending.pop()
+            with os.scandir(directory) as iterator:
+                for item in iterator:
+                    if item.name.startswith("."):
+                        continue
+                    if item.is_dir(follow_symlinks=False):
+                        if self.recursive:
+                            pending.append(item.path)
+                        continue
+                    name = os.path.relpath(item.path, self.root).replace(os.sep, "/")
+                    if not item.is_file() or not any(fnmatch.fnmatch(name, pattern) for pattern in self.include):
+                        continue
+                    if item.is_symlink() and not self._listed(name, os.path.realpath(item.path)):
+                        continue
+                    stat = item.stat()
+                    mime_type = mimetypes.guess_type(item.name)[0] or "application/octet-stream"
+                    entries[name] = FileEntry(name, item.path, stat.st_size, stat.st_mtime_ns, mime_type)
+        return entries
+
+    def entries(self) -> List[FileEntry]:
+        """Files as of the last scan, sorted by name"""
+        return [self._snapshot[name] for name in sorted(self._snapshot)]
+
+    def _listed(self, name: str, path: str) -> bool:
+        """Whether scan() would list name, resolved to path"""
+        if not path.startswith(self.root + os.sep):
+            return False
+        # Checked on the name as given and as resolved, so neither ".." nor a symlink reaches a hidden file
+        parts = name.split("/") + os.path.relpath(path, self.root).split(os.sep)
+        if any(not part or part.startswith(".") for part in parts):
+            return False
+        if not self.recursive and "/" in name:
+            return False
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.include)
+
+    def entry(self, name: str) -> FileEntry:
+        """Stat one resource, rejecting names that scan() would not list"""
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not self._listed(name, path) or not os.path.isfile(path):
+            raise ValueError(f"Unknown resource: {name}")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise ValueError(f"Unknown resource: {name}")
+        mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return FileEntry(name, path, stat.st_size, stat.st_mtime_ns, mime_type)
+
+    def _cached(self, entry: FileEntry) -> Optional[bytes]:
+        with self._lock:
+            cached = self._cache.get(entry.name)
+            if cached is None:
+                return None
+            mtime_ns, size, data = cached
+            if (mtime_ns, size) != (entry.mtime_ns, entry.size):
+                self._evict(entry.name)
+                return None
+            self._cache.move_to_end(entry.name)
+            return data
+
+    def _store(self, entry: FileEntry, data: bytes):
+        with self._lock:
+            self._evict(entry.name)
+            self._cache[entry.name] = (entry.mtime_ns, entry.size, data)
+            self.cache_bytes += len(data)
+            while self.cache_bytes > self.max_cache_bytes and self._cache:
+                self._evict(next(iter(self._cache)))
+
+    def _evict(self, name: str):
+        cached = self._cache.pop(name, None)
+        if cached is not None:
+            self.cache_bytes -= len(cached[2])
+
+    def read_bytes(self, name: str) -> bytes:
+        return self._read_entry(self.entry(name))
+
+    def _read_entry(self, entry: FileEntry) -> bytes:
+        data = self._cached(entry)
+        if data is not None:
+            return data
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        if len(data) == entry.size and entry.size <= self.max_cached_file:
+            self._store(entry, data)
+        return data
+
+    def read(self, name: str, encoding: str = "utf-8") -> Union[str, bytes]:
+        """Read a resource as text for text mime types, otherwise as bytes"""
+        entry = self.entry(name)
+        data = self._read_entry(entry)
+        return data.decode(encoding) if entry.is_text else data
+
+    def read_text(self, name: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(name).decode(encoding)
+
+    def poll_changes(self) -> Tuple[List[str], bool]:
+        """Rescan root and return the names that changed and whether the list of names did"""
+        snapshot = self.scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        changed = [
+            name for name in previous.keys() | snapshot.keys()
+            if name not in previous or name not in snapshot
+            or (previous[name].mtime_ns, previous[name].size) != (snapshot[name].mtime_ns, snapshot[name].size)
+        ]
+        with self._lock:
+            for name in changed:
+                self._evict(name)
+        return sorted(changed), previous.keys() != snapshot.keys()
+
+class ResourceNotifier:
+    """Polls a provider and notifies MCP sessions of changed resources.
+
+    Sessions that subscribed to a resource get resources/updated for it, and
+    sessions passed to track() get resources/list_changed when files are added
+    or removed. Sessions are held weakly, so closed connections drop out.
+    """
+    def __init__(self, provider: FileResourceProvider, uri_for: Callable[[str], str], interval: float = 1.0):
+        self.provider = provider
+        self.uri_for = uri_for
+        self.interval = interval
+        self.subscriptions = defaultdict(weakref.WeakSet)  # uri -> sessions
+        self.sessions = weakref.WeakSet()
+
+    def register(self, server: Server):
+        """Handle resources/subscribe and resources/unsubscribe on a low-level server"""
+        @server.subscribe_resource()
+        async def subscribe(uri: AnyUrl):
+            session = server.request_context.session
+            self.subscriptions[str(uri)].add(session)
+            self.sessions.add(session)
+
+        @server.unsubscribe_resource()
+        async def unsubscribe(uri: AnyUrl):
+            self.subscriptions[str(uri)].discard(server.request_context.session)
+
+    def track(self, session):
+        self.sessions.add(session)
+
+    async def _send(self, sessions, send):
+        for session in list(sessions):
+            try:
+                await send(session)
+            except Exception as e:
+                logger.debug(f"Dropping session after failed notification: {e}")
+                sessions.discard(session)
+
+    async def run(self):
+        while True:
+            await anyio.sleep(self.interval)
+            changed, list_changed = await anyio.to_thread.run_sync(self.provider.poll_changes)
+            for name in changed:
+                uri = self.uri_for(name)
+                if self.subscriptions.get(uri):
+                    await self._send(self.subscriptions[uri], lambda session: session.send_resource_updated(AnyUrl(uri)))
+            if list_changed:
+                await self._send(self.sessions, lambda session: session.send_resource_list_changed())
+
+def initialization_options(server: Server):
+    """Initialization options advertising resource subscriptions and list change notifications"""
+    options = server.create_initialization_options(NotificationOptions(resources_changed=True))
+    if options.capabilities.resources is not None:
+        options.capabilities.resources.subscribe = True
+    return options
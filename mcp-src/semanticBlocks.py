@@ -0,0 +1,195 @@
+"""
+Semantic block index for the merge tool.
+
+A file is scanned once into its classes, functions, methods and import runs.
+Python sources are parsed with ast; anything ast rejects falls back to a
+single compiled regex per line with an indentation stack. Blocks nest, and
+the index flattens them into sorted segments so the innermost block of a
+line, or the blocks touching a line range, are found with a binary search.
+"""
+
+import ast
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+PYTHON_EXTENSIONS = (".py", ".pyw", ".pyi")
+
+# One match per line: a decorator, a def, a class or a module level import
+BLOCK_LINE = re.compile(
+    r'^(?P<indent>[ \t]*)(?:'
+    r'(?P<decorator>@)'
+    r'|(?:async[ \t]+)?def[ \t]+(?P<function>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|class[ \t]+(?P<class>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|(?P<imports>(?:import|from)[ \t]))'
+)
+
+@dataclass(eq=False)
+class SemanticBlock:
+    start_line: int  # 1-based, decorators included
+    end_line: int  # 1-based, inclusive
+    type: str  # "class", "function", "method" or "imports"
+    name: Optional[str]
+    parent: Optional["SemanticBlock"] = field(default=None, repr=False)
+    qualname: str = ""  # Unique within a file, e.g. "Agent.run" or "Agent.run#2" for a redefinition
+
+    def contains(self, line: int) -> bool:
+        return self.start_line <= line <= self.end_line
+
+def language_for_path(path: Optional[str]) -> Optional[str]:
+    """Language hint for BlockIndex.build(), None when the extension does not tell"""
+    if path and path.lower().endswith(PYTHON_EXTENSIONS):
+        return "python"
+    return None
+
+def _python_blocks(content: str) -> List[SemanticBlock]:
+    tree = ast.parse(content)
+    blocks = []
+    pending: List[Tuple[ast.AST, Optional[SemanticBlock]]] = [(tree, None)]
+    while pending:
+        node, parent = pending.pop()
+        imports = None
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.Import, ast.ImportFrom)) and node is tree:
+                # Consecutive module level imports form one block
+                if imports is None:
+                    imports = SemanticBlock(child.lineno, child.end_lineno, "imports", None)
+                    blocks.append(imports)
+                imports.end_line = child.end_lineno
+                continue
+            imports = None
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if isinstance(child, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if parent is not None and parent.type == "class" else "function"
+                start = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                block = SemanticBlock(start, child.end_lineno, kind, child.name, parent)
+                blocks.append(block)
+                pending.append((child, block))
+            elif isinstance(child, (ast.stmt, ast.excepthandler)) or type(child).__name__ == "match_case":
+                # Definitions inside if/try/with/for bodies still belong to the enclosing block
+                pending.append((child, parent))
+    return blocks
+
+def _regex_blocks(lines: List[str]) -> List[SemanticBlock]:
+    blocks = []
+    open_blocks: List[Tuple[int, SemanticBlock]] = []  # (indentation, block), innermost last
+    last_code_line = 0
+    decorator_start = decorator_indentation = None
+    imports = None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indentation = len(line) - len(line.lstrip())
+        if decorator_start is not None and (indentation > decorator_indentation or stripped[0] in ")]}"):
+            # Arguments of a decorator spread over several lines
+            last_code_line = number
+            continue
+        # A line at or left of a block's own indentation closes it
+        while open_blocks and indentation <= open_blocks[-1][0]:
+            open_blocks.pop()[1].end_line = last_code_line
+        match = BLOCK_LINE.match(line)
+        kind = name = None
+        if match:
+            if match.group("decorator"):
+                if decorator_start is None:
+                    decorator_start, decorator_indentation = number, indentation
+                last_code_line = number
+                continue
+            if match.group("class"):
+                kind, name = "class", match.group("class")
+            elif match.group("function"):
+                parent = open_blocks[-1][1] if open_blocks else None
+                kind = "method" if parent is not None and parent.type == "class" else "function"
+                name = match.group("function")
+            elif indentation == 0:
+                kind = "imports"
+        if kind == "imports":
+            if imports is None or imports.end_line != last_code_line:
+                imports = SemanticBlock(number, number, "imports", None)
+                blocks.append(imports)
+            imports.end_line = number
+        elif kind:
+            block = SemanticBlock(decorator_start or number, number, kind, name,
+                                  open_blocks[-1][1] if open_blocks else None)
+            blocks.append(block)
+            open_blocks.append((indentation, block))
+        decorator_start = None
+        last_code_line = number
+    while open_blocks:
+        open_blocks.pop()[1].end_line = last_code_line
+    return blocks
+
+class BlockIndex:
+    """Semantic blocks of one file with line to block lookups"""
+    def __init__(self, blocks: List[SemanticBlock], line_count: int, parser: str = "regex"):
+        self.blocks = sorted(blocks, key=lambda block: (block.start_line, -block.end_line))
+        self.line_count = line_count
+        self.parser = parser
+        self.by_name: Dict[str, SemanticBlock] = {}
+        for block in self.blocks:
+            base = f"{block.parent.qualname}.{block.name or '<imports>'}" if block.parent else block.name or "<imports>"
+            block.qualname = base
+            repeat = 1
+            while block.qualname in self.by_name:
+                repeat += 1
+                block.qualname = f"{base}#{repeat}"
+            self.by_name[block.qualname] = block
+        self._starts, self._segments = self._flatten()
+
+    @classmethod
+    def build(cls, content: str, language: Optional[str] = None) -> "BlockIndex":
+        """Index content, with ast unless language says it is not Python or ast rejects it"""
+        lines = content.splitlines()
+        if language in (None, "python"):
+            try:
+                return cls(_python_blocks(content), len(lines), "ast")
+            except (SyntaxError, ValueError, RecursionError, MemoryError):
+                pass
+        return cls(_regex_blocks(lines), len(lines), "regex")
+
+    def _flatten(self) -> Tuple[List[int], List[Tuple[int, int, Optional[SemanticBlock]]]]:
+        # Split the nested blocks into consecutive segments owned by their innermost block
+        segments = []
+        stack: List[SemanticBlock] = []
+        position = 1
+
+        def close_until(line: int):
+            nonlocal position
+            while stack and stack[-1].end_line < line:
+                block = stack.pop()
+                if position <= block.end_line:
+                    segments.append((position, block.end_line, block))
+                    position = block.end_line + 1
+
+        for block in self.blocks:
+            close_until(block.start_line)
+            if position < block.start_line:
+                segments.append((position, block.start_line - 1, stack[-1] if stack else None))
+            position = max(position, block.start_line)
+            stack.append(block)
+        close_until(max([self.line_count] + [block.end_line for block in stack]) + 1)
+        if position <= self.line_count:
+            segments.append((position, self.line_count, None))
+        return [segment[0] for segment in segments], segments
+
+    def block_at(self, line: int) -> Optional[SemanticBlock]:
+        """Innermost block containing a 1-based line, or None"""
+        i = bisect_right(self._starts, line) - 1
+        if i < 0 or line > self._segments[i][1]:
+            return None
+        return self._segments[i][2]
+
+    def overlapping(self, start_line: int, end_line: int) -> List[SemanticBlock]:
+        """Innermost blocks of the lines from start_line to end_line, in order"""
+        found = []
+        i = max(bisect_right(self._starts, start_line) - 1, 0)
+        while i < len(self._segments) and self._segments[i][0] <= end_line:
+            block = self._segments[i][2]
+            if block is not None and self._segments[i][1] >= start_line and (not found or found[-1] is not block):
+                found.append(block)
+            i += 1
+        return found
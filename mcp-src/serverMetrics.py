@@ -0,0 +1,132 @@
+"""Session, message and handler latency metrics for the MCP servers in this folder."""
+import time
+from collections import deque
+from typing import Dict
+
+from mcp.server.lowlevel import Server
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RateCounter:
+    """Event counts in one-second buckets over the last window seconds"""
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.total = 0
+        self._buckets = deque()  # [second, count], oldest first
+
+    def add(self, count: int = 1):
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+        self.total += count
+        self._expire(second)
+
+    def _expire(self, now: int):
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def rate(self) -> float:
+        """Average events per second over the window"""
+        self._expire(int(time.monotonic()))
+        return sum(count for _, count in self._buckets) / self.window
+
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+class ServerMetrics:
+    """Counters rendered in the Prometheus text format by render()"""
+    def __init__(self, name: str = "mcp"):
+        self.name = name
+        self.started = time.time()
+        self.sessions_open = 0
+        self.sessions_total = 0
+        self.sessions_rejected = 0
+        self.messages = RateCounter()
+        self.messages_rejected = 0
+        self.requests_in_flight = 0
+        self.handlers: Dict[str, LatencyHistogram] = {}
+
+    def session_opened(self):
+        self.sessions_open += 1
+        self.sessions_total += 1
+
+    def session_closed(self):
+        self.sessions_open -= 1
+
+    def instrument(self, server: Server):
+        """Time every request handler registered on server so far"""
+        for request_type, handler in list(server.request_handlers.items()):
+            method = getattr(request_type.model_fields.get("method"), "default", None) or request_type.__name__
+            server.request_handlers[request_type] = self._timed(method, handler)
+
+    def _timed(self, method: str, handler):
+        histogram = self.handlers.setdefault(method, LatencyHistogram())
+
+        async def timed_handler(request):
+            self.requests_in_flight += 1
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            except BaseException:
+                histogram.errors += 1
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+                self.requests_in_flight -= 1
+
+        return timed_handler
+
+    def render(self) -> str:
+        prefix = self.name
+        lines = [
+            f"# TYPE {prefix}_uptime_seconds gauge",
+            f"{prefix}_uptime_seconds {time.time() - self.started:.1f}",
+            f"# TYPE {prefix}_sessions_open gauge",
+            f"{prefix}_sessions_open {self.sessions_open}",
+            f"# TYPE {prefix}_sessions_total counter",
+            f"{prefix}_sessions_total {self.sessions_total}",
+            f"# TYPE {prefix}_sessions_rejected_total counter",
+            f"{prefix}_sessions_rejected_total {self.sessions_rejected}",
+            f"# TYPE {prefix}_messages_total counter",
+            f"{prefix}_messages_total {self.messages.total}",
+            f"# TYPE {prefix}_messages_per_second gauge",
+            f"{prefix}_messages_per_second {self.messages.rate():.3f}",
+            f"# TYPE {prefix}_messages_rejected_total counter",
+            f"{prefix}_messages_rejected_total {self.messages_rejected}",
+            f"# TYPE {prefix}_requests_in_flight gauge",
+            f"{prefix}_requests_in_flight {self.requests_in_flight}",
+            f"# TYPE {prefix}_handler_seconds histogram",
+        ]
+        for method, histogram in sorted(self.handlers.items()):
+            if not histogram.count:
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_handler_seconds_bucket{{method="{method}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_handler_seconds_bucket{{method="{method}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_handler_seconds_sum{{method="{method}"}} {histogram.total:.6f}')
+            lines.append(f'{prefix}_handler_seconds_count{{method="{method}"}} {histogram.count}')
+        lines.append(f"# TYPE {prefix}_handler_seconds_max gauge")
+        lines.extend(f'{prefix}_handler_seconds_max{{method="{method}"}} {histogram.max:.6f}'
+                     for method, histogram in sorted(self.handlers.items()) if histogram.count)
+        lines.append(f"# TYPE {prefix}_handler_errors_total counter")
+        lines.extend(f'{prefix}_handler_errors_total{{method="{method}"}} {histogram.errors}'
+                     for method, histogram in sorted(self.handlers.items()) if histogram.count)
+        return "\n".join(lines) + "\n"
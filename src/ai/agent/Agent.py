@@ -1,23 +1,22 @@
 import time
 import logging
-from typing import List
-from langchain_ollama import OllamaLLM
+from typing import Iterator, List
 from ai.models.schema import AgentResponse
 from ai.config.AgentXSchema import AgentSchema, LlmConfig
 from ai.config.AgentXProvider import getAgentSchema
+from ai.agent.utils.Cancellation import CancellationToken, GenerationCancelled
 import json
 import re
-from ollama import generate as ollama_generate
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
  
+# LLM client libraries are imported where they are used, so importing this
+# module (and starting the GUI) does not load langchain or ollama
 def create_openai_qa_model(agentSchema: AgentSchema):
+    from langchain_openai import AzureChatOpenAI
+
     qa = AzureChatOpenAI(
         api_key=agentSchema.llmConfig.apiKey,
         azure_deployment=agentSchema.llmConfig.model,
@@ -49,14 +48,14 @@ class Agent:
         self.memory: List[str] = []
         self.llmConfig: LlmConfig = agentSchema.llmConfig
 
-    def timed_generate(self, prompt: str, responseSchema = None, file_name: str = "response-llm") -> AgentResponse:
+    def timed_generate(self, prompt: str, responseSchema = None, file_name: str = "response-llm", cancel_token: CancellationToken = None) -> AgentResponse:
         start_time = time.time()
         logger.info(f"{self.name} agent generating content...")
         
         with open(f"contents/{self.name}-prompt.md", 'w', encoding='utf-8') as f:
             f.write(f"Prompt: {prompt}\n\n")
 
-        response: AgentResponse = self.generate_structured(prompt, responseSchema) if responseSchema is not None else self.generate(prompt)
+        response: AgentResponse = self.generate_structured(prompt, responseSchema, cancel_token) if responseSchema is not None else self.generate(prompt, cancel_token)
         
         with open(f"contents/{self.name}-{file_name}.md", 'w', encoding='utf-8') as f:
             f.write(response.content if responseSchema is None else json.dumps(response.content, indent=4))
@@ -66,56 +65,83 @@ class Agent:
         
         return response
 
-    def generate(self, prompt: str) -> AgentResponse:
+    def _stream_chunks(self, chunks: Iterator[str], cancel_token: CancellationToken = None) -> Iterator[str]:
+        """Yield chunks until cancel_token is cancelled, then close the stream so the backend stops generating"""
         try:
-            full_prompt = f"{self.base_prompt}\n\nRole: {self.role}\n\n{prompt}"
+            for chunk in chunks:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield chunk
+        finally:
+            chunks.close()
+
+    def stream(self, prompt: str, cancel_token: CancellationToken = None) -> Iterator[str]:
+        """Generate content chunk by chunk"""
+        full_prompt = f"{self.base_prompt}\n\nRole: {self.role}\n\n{prompt}"
+
+        if self.useLangChain:
+            # Pass logic for connecting deployed LLM with LangChain here
+            model = create_gpt4o(self.agentSchema)
+            chunks = (chunk.content for chunk in model.stream(full_prompt))
+        else:
+            from langchain_ollama import OllamaLLM
+
+            self.llm = OllamaLLM(
+                provider="openai",
+                model=self.llmConfig.model,
+                base_url=self.llmConfig.base_url,
+                temperature=self.llmConfig.openAIConfig['temperature']
+            )
+            chunks = self.llm.stream(full_prompt)
+        yield from self._stream_chunks(chunks, cancel_token)
+
+    def generate(self, prompt: str, cancel_token: CancellationToken = None) -> AgentResponse:
+        try:
+            content = "".join(self.stream(prompt, cancel_token))
            
             if self.useLangChain:
-                # Pass logic for connecting deployed LLM with LangChain here
-                model = create_gpt4o(self.agentSchema)
-                response = model(full_prompt)
-                response = AgentResponse(content=response.content, metadata={"agent": self.name, "role": self.role, "json": True})
+                response = AgentResponse(content=content, metadata={"agent": self.name, "role": self.role, "json": True})
             else: 
-                self.llm = OllamaLLM(
-                    provider="openai",
-                    model=self.llmConfig.model,
-                    base_url=self.llmConfig.base_url,
-                    temperature=self.llmConfig.openAIConfig['temperature']
-                )
-
-                content = self.llm.invoke(full_prompt)
                 self.memory.append(content)
                 response = AgentResponse(content=content, metadata={"agent": self.name, "role": self.role, "json": False})
             return response
             
+        except GenerationCancelled:
+            raise
         except Exception as error:
             logger.error(f"Error in {self.name} agent:", error)
             raise RuntimeError(f"{self.name} agent failed to generate content")
 
-    def generate_structured(self, prompt: str, responseSchema = None) -> AgentResponse:
+    def generate_structured(self, prompt: str, responseSchema = None, cancel_token: CancellationToken = None) -> AgentResponse:
         """Generate content with structured response"""
 
         if self.useLangChain:
             # Pass logic for connecting deployed LLM with LangChain here
+            from langchain.prompts import PromptTemplate
+
             model = create_gpt4o(self.agentSchema)
             # Get the format instructions
             promptTemplate = PromptTemplate(
                 template=prompt
             )
-            response = model(prompt)
-            response = AgentResponse(content=extract_json(response.content), metadata={"agent": self.name, "role": self.role, "json": True})
+            chunks = (chunk.content for chunk in model.stream(prompt))
+            content = "".join(self._stream_chunks(chunks, cancel_token))
+            response = AgentResponse(content=extract_json(content), metadata={"agent": self.name, "role": self.role, "json": True})
         else:
+            from ollama import generate as ollama_generate
+
             full_prompt = f"{self.base_prompt}\n\nRole: {self.role}\n\n{prompt}"
-            response = ollama_generate(
+            chunks = ollama_generate(
                 model=self.llmConfig.model,
                 prompt=full_prompt,
                 format=responseSchema,
-                stream=False,
+                stream=True,
                 options={
                     "temperature": self.llmConfig.openAIConfig['temperature']
                 }
             )
-            response = AgentResponse(content=json.loads(response.response), metadata={"agent": self.name, "role": self.role, "json": True})
+            content = "".join(self._stream_chunks((chunk.response for chunk in chunks), cancel_token))
+            response = AgentResponse(content=json.loads(content), metadata={"agent": self.name, "role": self.role, "json": True})
 
         return response
 
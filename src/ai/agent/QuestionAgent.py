@@ -1,6 +1,7 @@
 import logging
 from ai.agent.Agent import Agent
 from ai.models.schema import AgentResponse
+from ai.agent.utils.Cancellation import CancellationToken
 from pydantic import Field, RootModel
 from typing import List
 from ai.models.psatModel import QuestionModel
@@ -20,7 +21,7 @@ class SystemAgent:
             )
         }
 
-    def executeQuery(self, prompt: str) -> str:
+    def executeQuery(self, prompt: str, cancel_token: CancellationToken = None) -> str:
         """Query the LLM with a prompt and return the response"""
 
         # print a physics question for friction, body, accelaration and force interation
@@ -36,6 +37,6 @@ class SystemAgent:
             Provide the question, correct answer, and choices in the JSON format.
         """
 
-        action_response: AgentResponse  = self.agents['bot'].timed_generate(agentPrompt, ResponseSchema.model_json_schema())
+        action_response: AgentResponse  = self.agents['bot'].timed_generate(agentPrompt, ResponseSchema.model_json_schema(), cancel_token=cancel_token)
 
         return action_response
\ No newline at end of file
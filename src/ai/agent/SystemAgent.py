@@ -1,6 +1,8 @@
 import logging
+from typing import Iterator
 from ai.agent.Agent import Agent
 from ai.models.schema import AgentResponse
+from ai.agent.utils.Cancellation import CancellationToken
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,9 +16,7 @@ class SystemAgent:
             )
         }
 
-    def executeQuery(self, prompt: str) -> str:
-        """Query the LLM with a prompt and return the response"""
-
+    def _build_prompt(self, prompt: str) -> str:
         # print a physics question for friction, body, accelaration and force interation
         # list 5 questions on friction topic with different level of complexity and hardness, have couple of questions with true false 
         agentPrompt = f"""
@@ -25,7 +25,14 @@ class SystemAgent:
 
             Keep response as you are a chatbot and answering in Female human voice.
         """
+        return agentPrompt
+
+    def executeQuery(self, prompt: str, cancel_token: CancellationToken = None) -> str:
+        """Query the LLM with a prompt and return the response"""
+        action_response: AgentResponse  = self.agents['bot'].timed_generate(self._build_prompt(prompt), cancel_token=cancel_token)
 
-        action_response: AgentResponse  = self.agents['bot'].timed_generate(agentPrompt)
+        return action_response
 
-        return action_response
\ No newline at end of file
+    def streamQuery(self, prompt: str, cancel_token: CancellationToken = None) -> Iterator[str]:
+        """Query the LLM with a prompt and yield the response as it is generated"""
+        return self.agents['bot'].stream(self._build_prompt(prompt), cancel_token)
@@ -1,103 +1,282 @@
-import pyaudio
+import argparse
 import json
+import re
 import time
 import numpy as np
-from vosk import Model, KaldiRecognizer
+from ai.agent.utils.AudioSources import SAMPLE_RATE, MicrophoneSource, WavFileSource, create_audio_source
+from ai.agent.utils.VAD import EnergyVAD
+from ai.agent.utils.VoskModels import get_model
+
+WAKE_WORD = "alexa"
+STOP_WORDS = ("stop", "terminate")
+# Audio after speech ends that is still fed to the wake word recognizer
+WAKE_TAIL_SECONDS = 0.5
 
 def detect_silence(audio_data, threshold=500):
     """Detect if the audio segment is silent."""
     audio_array = np.frombuffer(audio_data, dtype=np.int16)
     return np.max(np.abs(audio_array)) < threshold
 
-def process_audio(callback=None):
-    model = Model("vosk-model")
-    recognizer = KaldiRecognizer(model, 16000)
-    
-    p = pyaudio.PyAudio()
-    stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000,
-                    input=True, frames_per_buffer=4096)
-    stream.start_stream()
-
-    print("Waiting for wake word 'alexa'...")
-    is_listening = False
-    captured_audio = []
-    captured_audio_text = []
-    last_sound_time = None
+class SpeechPipeline:
+    """Wake word detection and transcription of one utterance at a time.
 
-    try:
-        while True:
-            data = stream.read(4096, exception_on_overflow=False)
-            if len(data) == 0:
-                continue
-
-            # Check for silence if we're already listening
-            if is_listening and detect_silence(data):
-                if last_sound_time and time.time() - last_sound_time > 2:
-                    print("Silence detected, processing audio...")
-                    # Process captured audio for final result
-                    if captured_audio:
-                        full_recognizer = KaldiRecognizer(model, 16000)
-                        for chunk in captured_audio:
-                            full_recognizer.AcceptWaveform(chunk)
-                        final_result = json.loads(full_recognizer.FinalResult()).get("text", "")
-                        if callback and final_result:
-                            callback(final_result)
-                    # Reset for next command
-                    is_listening = False
-                    captured_audio = []
-                    print("Waiting for wake word 'alexa'...")
-                    continue
-            else:
-                last_sound_time = time.time()
-            
-            # Process the current audio chunk
-            if recognizer.AcceptWaveform(data):
-                result = json.loads(recognizer.Result())
-                text = result.get("text", "").lower().replace("the ", "")
-
-                if not is_listening and "alexa" in text:
-                    print("Wake word detected! Listening...")
-                    is_listening = True
-                    callback(None, is_listening, False)  # Update indicator
-                    captured_audio = [data]
-                    text = None
-                    continue
-
-                if is_listening and ("stop" in text or "terminate" in text):
-                    print("Stop word detected! Processing audio...")
-                    is_listening = False
-                    callback(None, is_listening, False)  # Update indicator
-                    # Process captured audio for final result
-                    if captured_audio:
-                        final_result = ""
-                        for chunk in captured_audio_text:
-                            final_result += " " + chunk 
-                        if callback and final_result:
-                            print("final user said:", final_result)
-                            callback(final_result, False, False)
-                    # Reset for next command
-                    captured_audio = []
-                    print("Waiting for wake word 'alexa'...")
-                    continue
-
-            # Add data to captured_audio if we're listening
-            if is_listening:
-                if text is not None:
-                    print("user said:", text)
-                    captured_audio_text.append(text)
-                    text = None
-                captured_audio.append(data)
+    A single live recognizer is used; its final results are collected while
+    listening and the utterance is reported when the voice activity detector
+    reaches its endpoint or a stop word ends it. Time is measured in audio
+    seconds so recorded input can be processed faster than real time.
+
+    While idle, only speech is fed to a recognizer restricted to the wake word
+    grammar (idle_mode "grammar"); idle_mode "full" runs the full vocabulary
+    recognizer on every chunk as before.
+    """
+    def __init__(self, model, callback=None, silence_seconds=2.0, idle_mode="grammar"):
+        from vosk import KaldiRecognizer
+
+        self.recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+        self.wake_recognizer = KaldiRecognizer(model, SAMPLE_RATE, json.dumps([WAKE_WORD, "[unk]"]))
+        self.idle_mode = idle_mode
+        self._wake_pending = False
+        self.callback = callback
+        self.vad = EnergyVAD(SAMPLE_RATE, endpoint_ms=int(silence_seconds * 1000))
+        self.audio_time = 0.0
+        self.is_listening = False
+        self.utterance_text = []
+
+    def _notify(self, text, is_listening):
+        if self.callback:
+            self.callback(text, is_listening, False)
+
+    def reset(self):
+        """Clear the state of the current utterance"""
+        self.is_listening = False
+        self.utterance_text = []
+        self.vad.reset()
+        self.recognizer.Reset()
+        self.wake_recognizer.Reset()
+        self._wake_pending = False
+
+    @staticmethod
+    def _result_text(result, key="text"):
+        return json.loads(result).get(key, "").lower().replace("the ", "")
+
+    def _wake(self):
+        print("Wake word detected! Listening...")
+        self.reset()
+        self.is_listening = True
+        self._notify(None, True)
+
+    def _feed_idle(self, data):
+        """Look for the wake word in one chunk"""
+        if self.idle_mode == "full":
+            if self.recognizer.AcceptWaveform(data) and WAKE_WORD in self._result_text(self.recognizer.Result()):
+                self._wake()
+            return
+
+        if self.vad.silence_seconds > WAKE_TAIL_SECONDS:
+            # Nothing is decoded in silence, just flush what the last speech left behind
+            if self._wake_pending:
+                self._wake_pending = False
+                if WAKE_WORD in self._result_text(self.wake_recognizer.FinalResult()):
+                    self._wake()
+            return
+
+        self._wake_pending = True
+        if self.wake_recognizer.AcceptWaveform(data):
+            text = self._result_text(self.wake_recognizer.Result())
+        else:
+            text = self._result_text(self.wake_recognizer.PartialResult(), "partial")
+        if WAKE_WORD in text:
+            self._wake()
+
+    def feed(self, data):
+        """Process one chunk of 16-bit mono audio, returning the utterance text when one ends"""
+        self.audio_time += len(data) / 2 / SAMPLE_RATE
+
+        self.vad.process(data)
+        if not self.is_listening:
+            self._feed_idle(data)
+            return None
+
+        if self.vad.endpoint:
+            print("Silence detected, processing audio...")
+            return self._finish_utterance()
+
+        if not self.recognizer.AcceptWaveform(data):
+            return None
+        text = self._result_text(self.recognizer.Result())
+
+        if any(stop_word in text for stop_word in STOP_WORDS):
+            print("Stop word detected! Processing audio...")
+            return self._finish_utterance(include_pending=False)
+
+        if text:
+            print("user said:", text)
+            self.utterance_text.append(text)
+        return None
 
+    def flush(self):
+        """Finish an utterance still in progress at the end of the input"""
+        if self.is_listening:
+            return self._finish_utterance()
+        return None
+
+    def _finish_utterance(self, include_pending=True):
+        if include_pending:
+            # Words recognized since the last final result
+            text = self._result_text(self.recognizer.FinalResult())
+            if text:
+                self.utterance_text.append(text)
+        final_result = " ".join(self.utterance_text).strip()
+        self.reset()
+        self._notify(None, False)
+        if final_result:
+            print("final user said:", final_result)
+            if self.callback:
+                self.callback(final_result, False, False)
+        print(f"Waiting for wake word '{WAKE_WORD}'...")
+        return final_result
+
+def process_audio(callback=None, source=None):
+    """Run the speech pipeline over an audio source, the microphone by default"""
+    pipeline = SpeechPipeline(get_model(), callback)
+    source = source or MicrophoneSource()
+
+    print(f"Waiting for wake word '{WAKE_WORD}'...")
+
+    try:
+        with source:
+            for data in source.chunks():
+                pipeline.feed(data)
+        pipeline.flush()
     except KeyboardInterrupt:
         print("Stopping...")
-    finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
 
-def handle_result(text):
+def benchmark_cpu(path, model_path=None):
+    """Report recognition CPU time per second of audio for a WAV file.
+
+    The re-decode figure adds the previous behaviour of feeding every captured
+    utterance through a second recognizer once it ends.
+    """
+    model = get_model(model_path)
+    for redecode in (True, False):
+        utterances = []
+
+        def on_result(text, is_listening, is_playing):
+            if text:
+                utterances.append(pipeline_audio[:])
+
+        pipeline = SpeechPipeline(model, on_result)
+        pipeline_audio = []
+        start = time.process_time()
+        for data in WavFileSource(path).chunks():
+            if pipeline.is_listening:
+                pipeline_audio.append(data)
+            elif pipeline_audio:
+                pipeline_audio = []
+            pipeline.feed(data)
+        if redecode:
+            from vosk import KaldiRecognizer
+
+            for chunks in utterances:
+                full_recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+                for chunk in chunks:
+                    full_recognizer.AcceptWaveform(chunk)
+                full_recognizer.FinalResult()
+        cpu = time.process_time() - start
+        label = "before (re-decode)" if redecode else "after (live recognizer)"
+        print(f"{label}: {1000 * cpu / pipeline.audio_time:.1f}ms CPU per second of audio, "
+              f"{len(utterances)} utterances")
+
+def benchmark_idle(path, model_path=None):
+    """Compare CPU time of full and grammar restricted wake word spotting on a WAV file"""
+    model = get_model(model_path)
+    for idle_mode in ("full", "grammar"):
+        wakes = []
+        pipeline = SpeechPipeline(model, lambda text, is_listening, is_playing: is_listening and wakes.append(pipeline.audio_time),
+                                  idle_mode=idle_mode)
+        start = time.process_time()
+        for data in WavFileSource(path).chunks():
+            pipeline.feed(data)
+        cpu = time.process_time() - start
+        print(f"idle_mode={idle_mode}: {100 * cpu / pipeline.audio_time:.1f}% of one core, "
+              f"wake word at {[round(t, 1) for t in wakes]}s")
+
+def _words(text):
+    # Same normalization as the recognizer output, which drops "the"
+    return [word for word in re.findall(r"[a-z0-9']+", text.lower()) if word != "the"]
+
+def word_error_rate(reference, hypothesis):
+    """Word level edit distance between two transcripts, relative to the reference length"""
+    reference, hypothesis = _words(reference), _words(hypothesis)
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(reference), 1)
+
+def replay(source, expected_path=None, model_path=None):
+    """Run recorded audio through wake word, VAD and transcription and report
+    throughput, finalization latency and, given the expected utterances (one
+    per line), the word error rate.
+    """
+    model = get_model(model_path)
+    wakes = []
+    pipeline = SpeechPipeline(model, lambda text, is_listening, is_playing: is_listening and wakes.append(pipeline.audio_time))
+    utterances = []  # (audio time, seconds spent finalizing, text)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    with source:
+        for data in source.chunks():
+            feed_start = time.perf_counter()
+            text = pipeline.feed(data)
+            if text:
+                utterances.append((pipeline.audio_time, time.perf_counter() - feed_start, text))
+        feed_start = time.perf_counter()
+        text = pipeline.flush()
+        if text:
+            utterances.append((pipeline.audio_time, time.perf_counter() - feed_start, text))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    audio_seconds = pipeline.audio_time
+    print(f"audio: {audio_seconds:.1f}s in {wall:.2f}s wall, {cpu:.2f}s CPU "
+          f"({audio_seconds / max(wall, 1e-9):.1f}x realtime)")
+    print(f"wake words: {len(wakes)} at {[round(t, 1) for t in wakes]}s")
+    for audio_time, latency, text in utterances:
+        print(f"  {audio_time:7.1f}s  +{1000 * latency:.0f}ms  {text}")
+    if utterances:
+        latencies = sorted(latency for _, latency, _ in utterances)
+        print(f"finalization latency after the {pipeline.vad.endpoint_ms}ms endpoint: "
+              f"median {1000 * latencies[len(latencies) // 2]:.0f}ms, max {1000 * latencies[-1]:.0f}ms")
+    if expected_path:
+        with open(expected_path, encoding="utf-8") as f:
+            expected = [line.strip() for line in f if line.strip()]
+        error_rate = word_error_rate(" ".join(expected), " ".join(text for _, _, text in utterances))
+        print(f"utterances: {len(utterances)} of {len(expected)} expected, word error rate {100 * error_rate:.1f}%")
+    return utterances
+
+def handle_result(text, is_listening=False, is_playing=False):
     """Callback function to handle the recognized text."""
-    print("Final result:", text)
+    if text:
+        print("Final result:", text)
 
 if __name__ == "__main__":
-    process_audio(callback=handle_result)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Wake word and speech transcription pipeline")
+    parser.add_argument("command", nargs="?", default="listen", choices=["listen", "replay", "benchmark", "idle-benchmark"])
+    parser.add_argument("source", nargs="?", default="mic",
+                        help='"mic", "-" for raw 16 kHz 16-bit mono PCM on stdin, a WAV file or a raw PCM file')
+    parser.add_argument("--realtime", action="store_true", help="Pace recorded input like a live microphone")
+    parser.add_argument("--expected", help="Expected utterances, one per line, to measure accuracy")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark_cpu(args.source)
+    elif args.command == "idle-benchmark":
+        benchmark_idle(args.source)
+    elif args.command == "replay":
+        replay(create_audio_source(args.source, args.realtime), args.expected)
+    else:
+        process_audio(callback=handle_result, source=create_audio_source(args.source, args.realtime))
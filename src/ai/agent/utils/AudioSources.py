@@ -0,0 +1,125 @@
+import sys
+import time
+import wave
+from typing import BinaryIO, Iterator
+
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 4096
+
+class AudioSource:
+    """Chunks of 16-bit mono PCM audio for the speech pipeline.
+
+    Recorded sources are read as fast as they are consumed unless realtime is
+    set, which paces them like a live microphone.
+    """
+    def __init__(self, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES, realtime: bool = False):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.realtime = realtime
+
+    def read_chunks(self) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def chunks(self) -> Iterator[bytes]:
+        if not self.realtime:
+            yield from self.read_chunks()
+            return
+        start = time.perf_counter()
+        audio_seconds = 0.0
+        for data in self.read_chunks():
+            audio_seconds += len(data) / 2 / self.sample_rate
+            # A chunk is available once all of its audio has been "recorded"
+            delay = start + audio_seconds - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield data
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class MicrophoneSource(AudioSource):
+    """Live input from the default PyAudio device"""
+    def __init__(self, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES):
+        super().__init__(sample_rate, chunk_frames)
+        self._audio = None
+        self._stream = None
+
+    def read_chunks(self) -> Iterator[bytes]:
+        import pyaudio
+
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate,
+                                        input=True, frames_per_buffer=self.chunk_frames)
+        self._stream.start_stream()
+        while True:
+            data = self._stream.read(self.chunk_frames, exception_on_overflow=False)
+            if data:
+                yield data
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+class WavFileSource(AudioSource):
+    """Recorded WAV file, which must match the pipeline sample rate, mono 16-bit"""
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES, realtime: bool = False):
+        super().__init__(sample_rate, chunk_frames, realtime)
+        self.path = path
+
+    def read_chunks(self) -> Iterator[bytes]:
+        with wave.open(self.path, "rb") as wav_file:
+            if wav_file.getframerate() != self.sample_rate or wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise ValueError(f"{self.path} must be a {self.sample_rate} Hz mono 16-bit WAV file")
+            while True:
+                data = wav_file.readframes(self.chunk_frames)
+                if not data:
+                    return
+                yield data
+
+class PcmPipeSource(AudioSource):
+    """Raw little-endian 16-bit mono PCM from a binary stream, stdin by default.
+
+    For example: ffmpeg -i session.mp3 -f s16le -ac 1 -ar 16000 - | python -m ai.agent.pts replay -
+    """
+    def __init__(self, stream: BinaryIO = None, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES, realtime: bool = False):
+        super().__init__(sample_rate, chunk_frames, realtime)
+        self.stream = stream
+
+    def read_chunks(self) -> Iterator[bytes]:
+        stream = self.stream or sys.stdin.buffer
+        chunk_bytes = self.chunk_frames * 2
+        odd_byte = b""
+        while True:
+            data = stream.read(chunk_bytes)
+            if not data:
+                return
+            data = odd_byte + data
+            usable = len(data) & ~1
+            odd_byte = data[usable:]
+            if usable:
+                yield data[:usable]
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+
+def create_audio_source(spec: str = "mic", realtime: bool = False, chunk_frames: int = CHUNK_FRAMES) -> AudioSource:
+    """Create a source from "mic", "-" (PCM on stdin), a .wav path or a raw PCM file path"""
+    if spec == "mic":
+        return MicrophoneSource(chunk_frames=chunk_frames)
+    if spec == "-":
+        return PcmPipeSource(chunk_frames=chunk_frames, realtime=realtime)
+    if spec.lower().endswith(".wav"):
+        return WavFileSource(spec, chunk_frames=chunk_frames, realtime=realtime)
+    return PcmPipeSource(open(spec, "rb"), chunk_frames=chunk_frames, realtime=realtime)
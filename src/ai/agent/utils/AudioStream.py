@@ -0,0 +1,338 @@
+import asyncio
+import shutil
+import struct
+import sys
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+import numpy as np
+
+class AudioRingBuffer:
+    """Preallocated single-producer/single-consumer ring buffer of mono samples.
+
+    The producer blocks in write() while the buffer is full, the consumer
+    (an output stream callback) never blocks and gets silence on underrun.
+    """
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self._read_pos = 0
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def write(self, samples: np.ndarray):
+        """Copy samples into the buffer, waiting for free space as needed"""
+        offset = 0
+        while offset < len(samples):
+            with self._condition:
+                while self._size == self.capacity and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                count = min(len(samples) - offset, self.capacity - self._size)
+                write_pos = (self._read_pos + self._size) % self.capacity
+                first = min(count, self.capacity - write_pos)
+                self.buffer[write_pos:write_pos + first] = samples[offset:offset + first]
+                self.buffer[:count - first] = samples[offset + first:offset + count]
+                self._size += count
+                offset += count
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill out with buffered samples, padding with silence, and return the samples read"""
+        with self._condition:
+            count = min(len(out), self._size)
+            first = min(count, self.capacity - self._read_pos)
+            out[:first] = self.buffer[self._read_pos:self._read_pos + first]
+            out[first:count] = self.buffer[:count - first]
+            out[count:] = 0
+            self._read_pos = (self._read_pos + count) % self.capacity
+            self._size -= count
+            self._condition.notify_all()
+            return count
+
+    def free_space(self) -> int:
+        with self._condition:
+            return self.capacity - self._size
+
+    def finish(self):
+        """Mark the end of the clip, wait_drained() returns once everything is read"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def clear(self):
+        """Drop buffered samples and release a blocked writer"""
+        with self._condition:
+            self._size = 0
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait_drained(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._size == 0, timeout)
+
+    def reset(self):
+        with self._condition:
+            self._read_pos = 0
+            self._size = 0
+            self._closed = False
+
+class WavStreamDecoder:
+    """Decode a streamed 16-bit PCM WAV file without buffering the whole clip"""
+    def __init__(self):
+        self.sample_rate = None
+
+    async def decode(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[np.ndarray]:
+        pending = b""
+        in_riff = in_data = False
+        async for chunk in chunks:
+            pending += chunk
+            while not in_data:
+                if not in_riff:
+                    if len(pending) < 12:
+                        break
+                    if pending[:4] != b"RIFF" or pending[8:12] != b"WAVE":
+                        raise ValueError("Not a WAV stream")
+                    pending = pending[12:]
+                    in_riff = True
+                    continue
+                if len(pending) < 8:
+                    break
+                chunk_id, chunk_size = struct.unpack("<4sI", pending[:8])
+                if chunk_id == b"data":
+                    pending = pending[8:]
+                    in_data = True
+                    break
+                if len(pending) < 8 + chunk_size:
+                    break
+                if chunk_id == b"fmt ":
+                    _, channels, self.sample_rate, _, _, bits = struct.unpack("<HHIIHH", pending[8:24])
+                    if channels != 1 or bits != 16:
+                        raise ValueError("Only mono 16-bit WAV streams are supported")
+                pending = pending[8 + chunk_size + (chunk_size & 1):]
+            if not in_data:
+                continue
+            usable = len(pending) & ~1
+            if usable:
+                # View the received bytes as samples without copying them
+                yield np.frombuffer(pending, dtype=np.int16, count=usable // 2)
+                pending = pending[usable:]
+
+class FfmpegStreamDecoder:
+    """Decode a streamed compressed clip (mp3 from edge) to PCM with an ffmpeg pipe"""
+    def __init__(self, input_format: str = "mp3", sample_rate: int = 24000):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg is required to stream compressed audio")
+        self.input_format = input_format
+        self.sample_rate = sample_rate
+
+    async def decode(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[np.ndarray]:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-loglevel", "error", "-f", self.input_format, "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(self.sample_rate), "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            finally:
+                process.stdin.close()
+
+        feeder = asyncio.ensure_future(feed())
+        try:
+            odd_byte = b""
+            while True:
+                data = await process.stdout.read(8192)
+                if not data:
+                    break
+                data = odd_byte + data
+                usable = len(data) & ~1
+                odd_byte = data[usable:]
+                yield np.frombuffer(data, dtype=np.int16, count=usable // 2)
+            await feeder
+        finally:
+            feeder.cancel()
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+def can_stream(audio_format: str) -> bool:
+    """Whether create_decoder() can decode audio_format here, compressed formats need ffmpeg"""
+    return audio_format == "wav" or shutil.which("ffmpeg") is not None
+
+def create_decoder(audio_format: str):
+    if audio_format == "wav":
+        return WavStreamDecoder()
+    return FfmpegStreamDecoder(audio_format)
+
+def sounddevice_output_stream(**kwargs):
+    import sounddevice as sd
+
+    return sd.OutputStream(**kwargs)
+
+class StreamingPlayer:
+    """Play decoded PCM chunks as they arrive through an output stream callback.
+
+    Samples go through a fixed-size ring buffer, so playback starts with the
+    first decoded chunk and memory does not grow with the length of the clip.
+    """
+    def __init__(self, buffer_seconds: float = 2.0, blocksize: int = 1024,
+                 output_stream_factory: Callable = sounddevice_output_stream):
+        self.buffer_seconds = buffer_seconds
+        self.blocksize = blocksize
+        self.output_stream_factory = output_stream_factory
+        self.ring = None
+        self.first_audio_time = None  # perf_counter() of the first non-silent callback
+        self.last_audio_time = None  # perf_counter() of the latest non-silent callback
+
+    def _callback(self, outdata, frames, time_info, status):
+        if self.ring.read_into(outdata[:, 0]):
+            self.last_audio_time = time.perf_counter()
+            if self.first_audio_time is None:
+                self.first_audio_time = self.last_audio_time
+
+    async def play(self, chunks: AsyncIterator[bytes], audio_format: str):
+        """Decode and play a clip streamed as encoded audio chunks"""
+        loop = asyncio.get_event_loop()
+        decoder = create_decoder(audio_format)
+        stream = None
+        self.first_audio_time = None
+        try:
+            async for samples in decoder.decode(chunks):
+                if stream is None:
+                    capacity = int(decoder.sample_rate * self.buffer_seconds)
+                    if self.ring is None or self.ring.capacity != capacity:
+                        self.ring = AudioRingBuffer(capacity)
+                    self.ring.reset()
+                    stream = self.output_stream_factory(
+                        samplerate=decoder.sample_rate, channels=1, dtype="int16",
+                        blocksize=self.blocksize, callback=self._callback
+                    )
+                    stream.start()
+                if len(samples) <= self.ring.free_space():
+                    self.ring.write(samples)
+                else:
+                    await loop.run_in_executor(None, self.ring.write, samples)
+            if stream is not None:
+                self.ring.finish()
+                await loop.run_in_executor(None, self.ring.wait_drained)
+        finally:
+            if stream is not None:
+                stream.stop()
+                stream.close()
+
+    def stop(self):
+        """Silence the current clip immediately"""
+        if self.ring is not None:
+            self.ring.clear()
+
+class ClipStream:
+    """Encoded chunks of one clip, synthesized ahead of playback into a bounded queue"""
+    def __init__(self, audio_format: str, max_chunks: int = 64):
+        self.audio_format = audio_format
+        self.closed = False
+        self._chunks = asyncio.Queue(maxsize=max_chunks)
+
+    async def pump(self, chunks: AsyncIterator[bytes]):
+        """Feed synthesized chunks, waiting while the queue is full"""
+        try:
+            async for chunk in chunks:
+                if self.closed:
+                    break
+                await self._chunks.put(chunk)
+        finally:
+            if not self.closed:
+                await self._chunks.put(None)
+
+    def close(self):
+        """Stop consuming the clip and release a waiting pump()"""
+        self.closed = True
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+
+    async def __aiter__(self):
+        while not self.closed:
+            chunk = await self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+class RealtimeOutputStream:
+    """Stand-in for sounddevice.OutputStream that consumes audio at real-time pace"""
+    def __init__(self, samplerate, channels, dtype, blocksize, callback):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.outdata = np.zeros((blocksize, channels), dtype=dtype)
+        self._running = False
+        self._thread = None
+
+    def _run(self):
+        interval = self.blocksize / self.samplerate
+        next_time = time.perf_counter()
+        while self._running:
+            self.callback(self.outdata, self.blocksize, None, None)
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+async def file_chunks(path: str, chunk_size: int = 4096, chunk_delay: float = 0.01):
+    """Stream a file like a remote synthesizer delivering chunk_size bytes every chunk_delay seconds"""
+    with open(path, "rb") as f:
+        while True:
+            await asyncio.sleep(chunk_delay)
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def benchmark_first_audio(path: str):
+    """Compare latency to first audio of buffered and streaming playback of a WAV file"""
+    import io
+    import wave
+
+    async def buffered():
+        start = time.perf_counter()
+        audio_buffer = io.BytesIO()
+        async for chunk in file_chunks(path):
+            audio_buffer.write(chunk)
+        audio_buffer.seek(0)
+        with wave.open(audio_buffer) as wav_file:
+            np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16).astype(np.float64)
+        return time.perf_counter() - start
+
+    async def streaming():
+        player = StreamingPlayer(output_stream_factory=RealtimeOutputStream)
+        start = time.perf_counter()
+        await player.play(file_chunks(path), "wav")
+        return player.first_audio_time - start
+
+    print(f"buffered:  first audio after {1000 * asyncio.run(buffered()):.1f}ms")
+    print(f"streaming: first audio after {1000 * asyncio.run(streaming()):.1f}ms")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        benchmark_first_audio(sys.argv[1])
+    else:
+        import tempfile
+        from ai.agent.utils.TTSEngines import StubTTSEngine
+
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+            f.write(StubTTSEngine().render("A long answer " * 20))
+        benchmark_first_audio(f.name)
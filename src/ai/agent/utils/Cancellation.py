@@ -0,0 +1,47 @@
+import threading
+from typing import Callable, List
+
+class GenerationCancelled(Exception):
+    """Raised when work is abandoned because its CancellationToken was cancelled"""
+
+class CancellationToken:
+    """Thread-safe flag shared by everything working on one user request.
+
+    Cancelling runs the registered callbacks once, so blocking work such as
+    audio playback or an HTTP stream can be interrupted right away.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Warning: Cancellation callback failed: {str(e)}")
+
+    def add_callback(self, callback: Callable):
+        """Run callback on cancel, immediately if already cancelled"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise GenerationCancelled()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._event.wait(timeout)
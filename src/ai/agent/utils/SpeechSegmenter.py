@@ -0,0 +1,96 @@
+import re
+from typing import List
+from ai.ui.utils.parsers import MarkdownStreamParser
+
+# Fragments that are not read out
+SILENT_TAGS = {"code", "table", "emoji"}
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "vs", "etc", "e.g", "i.e", "approx", "fig"}
+# Only abbreviations when written this way ("St. Louis", not "first st.")
+CASED_ABBREVIATIONS = {"St"}
+# Only abbreviations before a number ("No. 5", not "He said no.")
+NUMBER_ABBREVIATIONS = {"no"}
+
+LIST_MARKER = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+')
+SPACES = re.compile(r'\s+')
+
+def markdown_to_speech_lines(text: str) -> List[str]:
+    """Strip markdown from text using the parse_markdown fragments, one entry per source line"""
+    parser = MarkdownStreamParser()
+    lines = []
+
+    def add(fragments):
+        spoken = "".join(part for part, tag in fragments if tag not in SILENT_TAGS)
+        spoken = SPACES.sub(" ", LIST_MARKER.sub("", spoken)).strip()
+        if spoken:
+            lines.append(spoken)
+
+    for line in text.split('\n'):
+        add(parser.feed(line + '\n'))
+    add(parser.flush())
+    return lines
+
+def split_sentences(line: str) -> List[str]:
+    """Split a line on sentence boundaries, ignoring decimals and common abbreviations"""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(line):
+        end = match.end()
+        rest = line[end:end + 1]
+        words = line[start:match.start()].split()
+        word = words[-1] if words else ""
+        last_word = word.lower()
+        if (last_word in ABBREVIATIONS or word in CASED_ABBREVIATIONS
+                or last_word in NUMBER_ABBREVIATIONS and rest.isdigit()
+                or len(last_word) == 1 and last_word.isalpha() and match.group().startswith('.')):
+            continue
+        if rest and not (rest.isupper() or rest.isdigit() or rest in "\"'([`"):
+            continue
+        sentences.append(line[start:end].strip())
+        start = end
+    if line[start:].strip():
+        sentences.append(line[start:].strip())
+    return sentences
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Split an overlong sentence on clause boundaries, then on spaces"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    parts = []
+    current = ""
+    for piece in CLAUSE_BREAK.split(sentence):
+        for word in ([piece] if len(piece) <= max_chars else piece.split(' ')):
+            candidate = f"{current} {word}" if current else word
+            if len(candidate) > max_chars and current:
+                parts.append(current)
+                current = word
+            else:
+                current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+def merge_segments(sentences: List[str], min_chars: int = 40, max_chars: int = 250) -> List[str]:
+    """Merge short sentences into synthesis units of roughly min_chars to max_chars"""
+    segments = []
+    current = ""
+    for sentence in sentences:
+        for part in _split_long(sentence, max_chars):
+            if not current:
+                current = part
+            elif len(current) < min_chars and len(current) + 1 + len(part) <= max_chars:
+                current = f"{current} {part}"
+            else:
+                segments.append(current)
+                current = part
+    if current:
+        segments.append(current)
+    return segments
+
+def segment_for_speech(text: str, min_chars: int = 40, max_chars: int = 250) -> List[str]:
+    """Turn a markdown response into speakable segments for TTSQueue"""
+    sentences = []
+    for line in markdown_to_speech_lines(text):
+        sentences.extend(split_sentences(line))
+    return merge_segments(sentences, min_chars, max_chars)
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import io
+import math
+import os
+import shutil
+import threading
+import wave
+from array import array
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional
+
+CHUNK_SIZE = 16 * 1024
+
+class TTSEngine:
+    """Base class for text to speech engines.
+
+    Engines stream encoded audio (audio_format) for a text and voice. Engines
+    that can only produce a whole clip may yield it as a single chunk.
+    """
+    name = "base"
+    audio_format = "mp3"
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+        yield b""
+
+    async def synthesize(self, text: str, voice: str) -> bytes:
+        """Synthesize the whole clip for text"""
+        audio_buffer = io.BytesIO()
+        async for chunk in self.stream(text, voice):
+            audio_buffer.write(chunk)
+        return audio_buffer.getvalue()
+
+class EdgeTTSEngine(TTSEngine):
+    """Remote Microsoft Edge TTS service"""
+    name = "edge"
+    audio_format = "mp3"
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        from edge_tts import Communicate
+
+        async for chunk in Communicate(text, voice).stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+class SubprocessTTSEngine(TTSEngine):
+    """Offline engine running a local synthesizer that writes a WAV file to stdout.
+
+    The command is a list of arguments where "{voice}" and "{text}" are
+    substituted, the default uses espeak-ng. Put "--" before "{text}" so a
+    sentence starting with "-" is not read as an option. Voices are passed
+    through voice_map first so the edge voice names used elsewhere keep working.
+    """
+    name = "espeak"
+    audio_format = "wav"
+
+    def __init__(self, command: List[str] = None, voice_map: dict = None, default_voice: str = "en-us"):
+        self.command = command or ["espeak-ng", "--stdout", "-v", "{voice}", "--", "{text}"]
+        self.voice_map = voice_map or {}
+        self.default_voice = default_voice
+        if shutil.which(self.command[0]) is None:
+            raise RuntimeError(f"TTS command not found: {self.command[0]}")
+
+    def _voice(self, voice: str) -> str:
+        if voice in self.voice_map:
+            return self.voice_map[voice]
+        # Edge voice names such as en-US-JennyNeural are not valid local voices
+        return self.default_voice if voice.endswith("Neural") else voice
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        args = [arg.format(voice=self._voice(voice), text=text) for arg in self.command]
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            while True:
+                chunk = await process.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+class StubTTSEngine(TTSEngine):
+    """Deterministic offline engine producing a tone whose length follows the text.
+
+    Useful for development without audio services and as a local stand-in in
+    benchmarks; delay simulates synthesis time per clip.
+    """
+    name = "stub"
+    audio_format = "wav"
+
+    def __init__(self, sample_rate: int = 16000, seconds_per_char: float = 0.03, delay: float = 0.0):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.delay = delay
+
+    def render(self, text: str) -> bytes:
+        frames = int(self.sample_rate * max(len(text), 1) * self.seconds_per_char)
+        step = 2 * math.pi * 440 / self.sample_rate
+        samples = array("h", (int(3000 * math.sin(i * step)) for i in range(frames)))
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(samples.tobytes())
+        return wav_buffer.getvalue()
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        data = self.render(text)
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield data[offset:offset + CHUNK_SIZE]
+
+class TTSCache:
+    """Disk cache of synthesized clips keyed by (engine, voice, text).
+
+    Entries are evicted least recently used first once the cache holds more
+    than max_bytes.
+    """
+    def __init__(self, cache_dir: str = "contents/tts-cache", max_bytes: int = 64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, file_name, size in sorted(files):
+            self._entries[file_name] = size
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def key(engine_name: str, text: str, voice: str, audio_format: str) -> str:
+        digest = hashlib.sha256(f"{engine_name}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+        return f"{digest}.{audio_format}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the path of a cached clip, marking it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            self._discard(key)
+            return None
+        return self.path(key)
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        tmp_path = f"{self.path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(key))
+        with self._lock:
+            self.total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _discard(self, key: str):
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+class CachedTTSEngine(TTSEngine):
+    """Engine wrapper serving repeated (text, voice) pairs from a TTSCache"""
+    def __init__(self, engine: TTSEngine, cache: TTSCache):
+        self.engine = engine
+        self.cache = cache
+        self.name = engine.name
+        self.audio_format = engine.audio_format
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        key = self.cache.key(self.engine.name, text, voice, self.audio_format)
+        cached_path = self.cache.get(key)
+        if cached_path is not None:
+            with open(cached_path, "rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        audio_buffer = io.BytesIO()
+        async for chunk in self.engine.stream(text, voice):
+            audio_buffer.write(chunk)
+            yield chunk
+        if audio_buffer.tell():
+            self.cache.put(key, audio_buffer.getvalue())
+
+def create_tts_engine(name: str = None, cache_dir: str = "contents/tts-cache", max_cache_bytes: int = 64 * 1024 * 1024) -> TTSEngine:
+    """Create the engine selected by name or the TTS_ENGINE environment variable, with caching"""
+    name = name or os.getenv("TTS_ENGINE", "edge")
+    engines = {
+        "edge": EdgeTTSEngine,
+        "espeak": SubprocessTTSEngine,
+        "stub": StubTTSEngine,
+    }
+    if name not in engines:
+        raise ValueError(f"Unknown TTS engine: {name}")
+    engine = engines[name]()
+    if max_cache_bytes <= 0:
+        return engine
+    return CachedTTSEngine(engine, TTSCache(cache_dir, max_cache_bytes))
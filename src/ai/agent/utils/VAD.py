@@ -0,0 +1,188 @@
+import sys
+import time
+import wave
+from typing import List, Tuple
+import numpy as np
+
+class EnergyVAD:
+    """Voice activity detector on the RMS energy of short frames.
+
+    Frames louder than threshold_ratio times the adaptive noise floor (and at
+    least min_threshold) count as speech once start_frames of them follow each
+    other. Speech continues for hangover_ms after the last loud frame, and the
+    noise floor follows the energy of non-speech frames. RMS is computed in
+    preallocated buffers, so processing a chunk does not allocate.
+    """
+    def __init__(self, sample_rate=16000, frame_ms=16, threshold_ratio=3.0, min_threshold=150.0,
+                 noise_adapt=0.05, hangover_ms=300, start_frames=2, endpoint_ms=2000):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.noise_adapt = noise_adapt
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.start_frames = start_frames
+        self.endpoint_ms = endpoint_ms
+        self._work = np.empty(0, dtype=np.float32)
+        self._rms = np.empty(0, dtype=np.float32)
+        self._remainder = np.empty(self.frame_len, dtype=np.int16)
+        self._remainder_len = 0
+        self.reset()
+
+    def reset(self):
+        """Forget speech state, keeping the learned noise floor"""
+        if not hasattr(self, "noise_floor"):
+            self.noise_floor = self.min_threshold / self.threshold_ratio
+        self.is_speech = False
+        self._speech_run = 0
+        self._hangover = 0
+        self.silence_frames = 0
+        self._remainder_len = 0
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+
+    @property
+    def silence_seconds(self) -> float:
+        """Duration of non-speech since speech last ended"""
+        return self.silence_frames * self.frame_ms / 1000
+
+    @property
+    def endpoint(self) -> bool:
+        """True once silence has lasted endpoint_ms"""
+        return self.silence_frames * self.frame_ms >= self.endpoint_ms
+
+    def frame_rms(self, samples: np.ndarray) -> np.ndarray:
+        """RMS of each complete frame in samples, written to a reused buffer"""
+        frames = len(samples) // self.frame_len
+        size = frames * self.frame_len
+        if len(self._work) < size:
+            self._work = np.empty(size, dtype=np.float32)
+            self._rms = np.empty(frames, dtype=np.float32)
+        work = self._work[:size]
+        rms = self._rms[:frames]
+        np.multiply(samples[:size], samples[:size], out=work, dtype=np.float32)
+        np.add.reduce(work.reshape(frames, self.frame_len), axis=1, out=rms)
+        np.multiply(rms, 1.0 / self.frame_len, out=rms)
+        np.sqrt(rms, out=rms)
+        return rms
+
+    def process(self, data: bytes) -> bool:
+        """Process a chunk of 16-bit mono audio and return whether speech is active"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self._remainder_len:
+            # Complete the frame left over from the previous chunk
+            needed = self.frame_len - self._remainder_len
+            self._remainder[self._remainder_len:self._remainder_len + min(needed, len(samples))] = samples[:needed]
+            if len(samples) < needed:
+                self._remainder_len += len(samples)
+                return self.is_speech
+            self._update(self.frame_rms(self._remainder))
+            samples = samples[needed:]
+            self._remainder_len = 0
+        self._update(self.frame_rms(samples))
+        tail = len(samples) % self.frame_len
+        if tail:
+            self._remainder[:tail] = samples[len(samples) - tail:]
+            self._remainder_len = tail
+        return self.is_speech
+
+    def _update(self, rms: np.ndarray):
+        # Sequential state machine over a handful of frames, kept in locals
+        is_speech, speech_run, hangover = self.is_speech, self._speech_run, self._hangover
+        silence_frames, noise_floor = self.silence_frames, self.noise_floor
+        for energy in rms.tolist():
+            if energy > max(self.min_threshold, noise_floor * self.threshold_ratio):
+                speech_run += 1
+                if speech_run >= self.start_frames:
+                    is_speech = True
+                    hangover = self.hangover_frames
+            else:
+                speech_run = 0
+                if hangover > 0:
+                    hangover -= 1
+                else:
+                    is_speech = False
+            if is_speech:
+                silence_frames = 0
+            else:
+                silence_frames += 1
+                noise_floor += self.noise_adapt * (energy - noise_floor)
+        self.is_speech, self._speech_run, self._hangover = is_speech, speech_run, hangover
+        self.silence_frames, self.noise_floor = silence_frames, noise_floor
+
+def detect_segments(chunks, vad: EnergyVAD, chunk_seconds: float) -> List[Tuple[float, float]]:
+    """Return (start, end) seconds of the speech segments in a chunk iterator"""
+    segments = []
+    start = None
+    position = 0.0
+    for data in chunks:
+        is_speech = vad.process(data)
+        if is_speech and start is None:
+            start = position
+        elif not is_speech and start is not None:
+            segments.append((start, position))
+            start = None
+        position += len(data) / 2 / vad.sample_rate
+    if start is not None:
+        segments.append((start, position))
+    return segments
+
+def wav_chunks(path: str, chunk_frames: int = 4096):
+    with wave.open(path, "rb") as wav_file:
+        if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path} must be a mono 16-bit WAV file")
+        while True:
+            data = wav_file.readframes(chunk_frames)
+            if not data:
+                return
+            yield data
+
+def synthetic_audio(seconds=10.0, sample_rate=16000, bursts=((2.0, 3.5), (6.0, 6.8)), noise=80.0, seed=0):
+    """Noise with tone bursts at known times, used when no WAV fixtures are given"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # Slowly rising noise checks that the floor adapts
+    audio = rng.normal(0, noise, len(t)) * (1 + t / seconds)
+    for start, end in bursts:
+        mask = (t >= start) & (t < end)
+        audio[mask] += 4000 * np.sin(2 * np.pi * 220 * t[mask])
+    return np.clip(audio, -32768, 32767).astype(np.int16).tobytes()
+
+def benchmark(chunks: List[bytes], sample_rate: int = 16000):
+    """Compare per-chunk cost of detect_silence and EnergyVAD"""
+    from ai.agent.pts import detect_silence
+
+    repeat = max(1, 2000 // len(chunks))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in chunks:
+            detect_silence(data)
+    peak = (time.perf_counter() - start) / (repeat * len(chunks))
+    vad = EnergyVAD(sample_rate)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in chunks:
+            vad.process(data)
+    energy = (time.perf_counter() - start) / (repeat * len(chunks))
+    print(f"detect_silence: {1e6 * peak:.1f}us/chunk, EnergyVAD: {1e6 * energy:.1f}us/chunk")
+
+if __name__ == "__main__":
+    chunk_frames = 4096
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with wave.open(path, "rb") as wav_file:
+                sample_rate = wav_file.getframerate()
+            chunks = list(wav_chunks(path, chunk_frames))
+            print(path, detect_segments(chunks, EnergyVAD(sample_rate), chunk_frames / sample_rate))
+            benchmark(chunks, sample_rate)
+    else:
+        audio = synthetic_audio()
+        chunks = [audio[i:i + chunk_frames * 2] for i in range(0, len(audio), chunk_frames * 2)]
+        vad = EnergyVAD(hangover_ms=100)
+        segments = detect_segments(chunks, vad, chunk_frames / 16000)
+        print("synthetic segments:", [(round(s, 2), round(e, 2)) for s, e in segments])
+        assert len(segments) == 2 and abs(segments[0][0] - 2.0) < 0.3 and abs(segments[1][1] - 6.8) < 0.4, segments
+        benchmark(chunks)
@@ -1,53 +1,105 @@
 import asyncio
 import io
-from edge_tts import Communicate
-import sounddevice as sd
-import soundfile as sf
-from collections import deque
 import time
 import threading
-from queue import Queue
+import sys
 import nest_asyncio
-import wave
-import json
-from vosk import Model, KaldiRecognizer
-
-model = Model("vosk-model")
+from ai.agent.utils.TTSEngines import TTSEngine, create_tts_engine
+from ai.agent.utils.AudioStream import ClipStream, StreamingPlayer, can_stream
+from ai.agent.utils.Cancellation import CancellationToken
 
 # Enable nested event loops
 nest_asyncio.apply()
 
 class TTSQueue:
-    def __init__(self, status_callback=None):
-        self.queue = deque()
+    def __init__(self, status_callback=None, look_ahead=2, engine: TTSEngine = None, streaming=True):
+        self.engine = engine  # Created on first use, defaults to the TTS_ENGINE engine with caching
+        self.streaming = streaming  # Decode and play clips while they are being synthesized
+        self.player = StreamingPlayer()
+        self.queue = asyncio.Queue()  # Texts waiting for synthesis, fed from any thread
         self.is_playing = False
         self.pause_duration = 0.15
+        self.look_ahead = look_ahead  # Clips synthesized ahead of the one playing, 0 disables pipelining
         self.should_stop = False
         self._thread = None
         self._loop = None
         self.status_callback = status_callback  # Add status callback
+        self._epoch = 0  # Incremented by cancel(), items from older epochs are dropped
+        self._active_clips = set()
+        self._last_token = None
         
-    def add_text(self, text, voice="en-US-JennyNeural"):
-        """Add text to the queue"""
-        print(f"{text}")
-        self.queue.append({"text": text, "voice": voice})
+    def add_text(self, text, voice="en-US-JennyNeural", cancel_token: CancellationToken = None):
+        """Add text to the queue, safe to call from any thread.
+
+        Cancelling cancel_token silences the queue and drops everything queued so far.
+        """
+        if cancel_token is not None:
+            if cancel_token.is_cancelled:
+                return
+            if cancel_token is not self._last_token:
+                self._last_token = cancel_token
+                cancel_token.add_callback(self.cancel)
+        self._put({"text": text, "voice": voice, "epoch": self._epoch, "token": cancel_token})
+
+    def cancel(self):
+        """Drop queued texts and stop synthesis and playback in progress, safe to call from any thread"""
+        self._epoch += 1
+        self.stop_playback()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._cancel_pending)
+
+    def _cancel_pending(self):
+        while not self.queue.empty():
+            if self.queue.get_nowait() is None:
+                self.queue.put_nowait(None)
+                break
+        for clip in list(self._active_clips):
+            clip.close()
+
+    def stop_playback(self):
+        self.player.stop()
+        if not self.streaming:
+            import sounddevice as sd
+
+            sd.stop()
+
+    def _is_stale(self, item):
+        token = item.get("token")
+        return item.get("epoch") != self._epoch or token is not None and token.is_cancelled
+
+    def _put(self, item):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.queue.put_nowait, item)
+        else:
+            self.queue.put_nowait(item)
         
     def start_processing(self):
         """Start processing in a separate thread"""
         if self._thread is None or not self._thread.is_alive():
             self.should_stop = False
+            # A queue is bound to the loop that first waited on it, carry pending texts over
+            pending, self.queue = self.queue, asyncio.Queue()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    self.queue.put_nowait(item)
+            self._loop = asyncio.new_event_loop()
             self._thread = threading.Thread(target=self._run_async_loop, daemon=True)
             self._thread.start()
     
     def stop_processing(self):
         """Stop processing the queue"""
         self.should_stop = True
+        self._put(None)  # Wake up the worker if it is waiting for text
         if self._thread and self._thread.is_alive():
             self._thread.join()
+        if self._loop is not None:
+            # Texts added from now on wait in the queue until start_processing() carries them over
+            loop, self._loop = self._loop, None
+            loop.close()
             
     def _run_async_loop(self):
         """Run the async event loop in the thread"""
-        self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
         self._loop.run_until_complete(self.process_queue())
         
@@ -58,40 +110,188 @@ class TTSQueue:
                 asyncio.get_event_loop().call_soon_threadsafe(self.status_callback, is_playing)
             except Exception as e:
                 print(f"Warning: Status callback failed: {str(e)}")
+
+    def _set_playing(self, is_playing):
+        if self.is_playing != is_playing:
+            self.is_playing = is_playing
+            self._safe_callback(is_playing)
                 
     async def process_queue(self):
-        """Process all items in the queue"""
-        self.is_playing = True
-        self._safe_callback(self.is_playing)
-        
+        """Process items as they are queued, synthesizing ahead of playback"""
+        if self.look_ahead <= 0:
+            await self._process_sequential()
+        else:
+            clips = asyncio.Queue(maxsize=self.look_ahead)
+            synthesis = asyncio.ensure_future(self._synthesis_worker(clips))
+            try:
+                await self._playback_worker(clips)
+            finally:
+                synthesis.cancel()
+        self._set_playing(False)
+
+    async def _process_sequential(self):
         while not self.should_stop:
-            if self.queue:
-                item = self.queue.popleft()
+            item = await self.queue.get()
+            if item is None:
+                break
+            if not self._is_stale(item):
                 await self.text_to_speech(item["text"], item["voice"])
-                time.sleep(self.pause_duration)
+
+    async def _synthesis_worker(self, clips):
+        """Synthesize queued texts into at most look_ahead pending clips"""
+        while not self.should_stop:
+            item = await self.queue.get()
+            if item is None:
+                break
+            if self._is_stale(item):
+                continue
+            if self._use_streaming():
+                clip = ClipStream(self._get_engine().audio_format)
+                await clips.put((item, clip))
+                await self._pump_safe(clip, item["text"], item["voice"])
             else:
-                await asyncio.sleep(0.1)
-                
-        self.is_playing = False
-        self._safe_callback(self.is_playing)
+                await clips.put((item, await self._synthesize_safe(item["text"], item["voice"])))
+        await clips.put(None)
 
-    async def text_to_speech(self, text, voice="en-US-ChristopherNeural"):
-        """Convert text to speech and play it directly"""
+    async def _playback_worker(self, clips):
+        while not self.should_stop:
+            if clips.empty():
+                self._set_playing(False)
+            entry = await clips.get()
+            if entry is None:
+                break
+            item, clip = entry
+            if self._is_stale(item):
+                if isinstance(clip, ClipStream):
+                    clip.close()
+                continue
+            self._set_playing(True)
+            await self._play_safe(clip)
+
+    def _get_engine(self):
+        if self.engine is None:
+            self.engine = create_tts_engine()
+        return self.engine
+
+    def _use_streaming(self):
+        """Stream clips unless the engine's format cannot be decoded here, then synthesize whole clips"""
+        if self.streaming and not can_stream(self._get_engine().audio_format):
+            print(f"Warning: ffmpeg not found, playing {self._get_engine().audio_format} clips after synthesis instead of streaming them")
+            self.streaming = False
+        return self.streaming
+
+    async def _pump_safe(self, clip, text, voice):
+        self._active_clips.add(clip)
         try:
-            communicate = Communicate(text, voice)
-            audio_buffer = io.BytesIO()
-            
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_buffer.write(chunk["data"])
-            
-            audio_buffer.seek(0)
-            audio_data, sample_rate = sf.read(audio_buffer)
-            sd.play(audio_data, sample_rate)
-            sd.wait()
-            
+            await clip.pump(self._get_engine().stream(text, voice))
         except Exception as e:
             print(f"Error occurred: {str(e)}")
+        finally:
+            self._active_clips.discard(clip)
+
+    async def _synthesize_safe(self, text, voice):
+        try:
+            return await self.synthesize(text, voice)
+        except Exception as e:
+            print(f"Error occurred: {str(e)}")
+            return None
+
+    async def _play_safe(self, clip):
+        if clip is None:
+            return
+        epoch = self._epoch
+        try:
+            if isinstance(clip, ClipStream):
+                self._active_clips.add(clip)
+                await self.player.play(clip, clip.audio_format)
+            else:
+                # Playback blocks, run it off the loop so synthesis keeps going
+                await asyncio.get_event_loop().run_in_executor(None, self.play, *clip)
+            if epoch == self._epoch:
+                await asyncio.sleep(self.pause_duration)
+        except Exception as e:
+            print(f"Error occurred: {str(e)}")
+        finally:
+            if isinstance(clip, ClipStream):
+                self._active_clips.discard(clip)
+                clip.close()
+
+    async def synthesize(self, text, voice="en-US-ChristopherNeural"):
+        """Convert text to speech, returning (audio_data, sample_rate)"""
+        import soundfile as sf
+
+        audio_buffer = io.BytesIO(await self._get_engine().synthesize(text, voice))
+        return sf.read(audio_buffer)
+
+    def play(self, audio_data, sample_rate):
+        """Play decoded audio, blocking until it is finished"""
+        import sounddevice as sd
+
+        sd.play(audio_data, sample_rate)
+        sd.wait()
+
+    async def text_to_speech(self, text, voice="en-US-ChristopherNeural"):
+        """Convert text to speech and play it directly"""
+        self._set_playing(True)
+        if self._use_streaming():
+            clip = ClipStream(self._get_engine().audio_format)
+            await asyncio.gather(self._pump_safe(clip, text, voice), self._play_safe(clip))
+        else:
+            await self._play_safe(await self._synthesize_safe(text, voice))
+
+class StandInTTSQueue(TTSQueue):
+    """TTSQueue with a local stand-in synthesizer and player, used for benchmarks"""
+    def __init__(self, synthesis_time=0.3, playback_time=0.5, **kwargs):
+        super().__init__(streaming=False, **kwargs)
+        self.synthesis_time = synthesis_time
+        self.playback_time = playback_time
+        self.playback_log = []  # (start, end) of each played clip
+
+    async def synthesize(self, text, voice="en-US-ChristopherNeural"):
+        await asyncio.sleep(self.synthesis_time)
+        return text, 16000
+
+    def play(self, audio_data, sample_rate):
+        start = time.perf_counter()
+        time.sleep(self.playback_time)
+        self.playback_log.append((start, time.perf_counter()))
+
+def benchmark_barge_in(sentences=5, barge_in_after=1.0):
+    """Measure the time from cancelling a request to silence while a long answer is playing"""
+    from ai.agent.utils.AudioStream import RealtimeOutputStream
+    from ai.agent.utils.TTSEngines import StubTTSEngine
+
+    tts_queue = TTSQueue(engine=StubTTSEngine(delay=0.05))
+    tts_queue.player = StreamingPlayer(output_stream_factory=RealtimeOutputStream)
+    tts_queue.start_processing()
+    cancel_token = CancellationToken()
+    for i in range(sentences):
+        tts_queue.add_text(f"This is sentence number {i} of a long answer that keeps on going for a while.", cancel_token=cancel_token)
+    time.sleep(barge_in_after)
+    barge_in_time = time.perf_counter()
+    cancel_token.cancel()
+    time.sleep(1.0)
+    tts_queue.stop_processing()
+    player = tts_queue.player
+    block_time = player.blocksize / 16000
+    print(f"barge-in to silence: {1000 * (player.last_audio_time + block_time - barge_in_time):.1f}ms "
+          f"(one output block is {1000 * block_time:.1f}ms)")
+
+def benchmark_gap(sentences=8, synthesis_time=0.3, playback_time=0.5):
+    """Measure the silence between consecutive sentences with and without look-ahead"""
+    for look_ahead in (0, 2):
+        tts_queue = StandInTTSQueue(synthesis_time, playback_time, look_ahead=look_ahead)
+        tts_queue.pause_duration = 0
+        tts_queue.start_processing()
+        for i in range(sentences):
+            tts_queue.add_text(f"Sentence {i}.")
+        while len(tts_queue.playback_log) < sentences:
+            time.sleep(0.05)
+        tts_queue.stop_processing()
+        log = tts_queue.playback_log
+        gaps = [log[i + 1][0] - log[i][1] for i in range(len(log) - 1)]
+        print(f"look_ahead={look_ahead}: mean inter-sentence gap {1000 * sum(gaps) / len(gaps):.1f}ms, "
+              f"max {1000 * max(gaps):.1f}ms")
 
 # Example usage
 def main():
@@ -121,4 +321,9 @@ def main():
     tts_queue.stop_processing()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_gap()
+    elif len(sys.argv) > 1 and sys.argv[1] == "barge-in":
+        benchmark_barge_in()
+    else:
+        main()
\ No newline at end of file
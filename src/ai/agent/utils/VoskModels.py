@@ -0,0 +1,86 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "vosk-model")
+
+_models = {}  # model path -> loaded vosk Model
+_locks = {}  # model path -> lock held while that model loads
+_registry_lock = threading.Lock()
+
+def _model_lock(path: str) -> threading.Lock:
+    with _registry_lock:
+        return _locks.setdefault(path, threading.Lock())
+
+def get_model(path: str = None):
+    """Return the shared Vosk model for path, loading it on first use.
+
+    Callers asking for a model that is still loading wait for that load
+    instead of starting another one.
+    """
+    path = path or DEFAULT_MODEL_PATH
+    model = _models.get(path)
+    if model is not None:
+        return model
+    with _model_lock(path):
+        model = _models.get(path)
+        if model is None:
+            from vosk import Model
+
+            start = time.perf_counter()
+            model = Model(path)
+            _models[path] = model
+            logger.info("Loaded Vosk model %s in %.2fs", path, time.perf_counter() - start)
+    return model
+
+def is_loaded(path: str = None) -> bool:
+    return (path or DEFAULT_MODEL_PATH) in _models
+
+def preload_in_background(path: str = None, on_loaded: Optional[Callable] = None) -> threading.Thread:
+    """Load the model in a daemon thread and call on_loaded(model) from that thread"""
+    def load():
+        try:
+            model = get_model(path)
+        except Exception as e:
+            logger.error("Failed to load Vosk model %s: %s", path or DEFAULT_MODEL_PATH, e)
+            return
+        if on_loaded:
+            on_loaded(model)
+
+    thread = threading.Thread(target=load, name="vosk-preload", daemon=True)
+    thread.start()
+    return thread
+
+# Statements timed in a fresh interpreter by measure_startup(), {path} is the model path
+STARTUP_SCENARIOS = [
+    ("before: import-time model + process_audio model", "from vosk import Model; Model({path!r}); Model({path!r})"),
+    ("after: import voice modules", "import ai.agent.utils.VoiceUtils, ai.agent.pts"),
+    ("after: first get_model() + shared reuse", "from ai.agent.utils.VoskModels import get_model; get_model({path!r}); get_model({path!r})"),
+]
+
+def measure_startup(path: str = None):
+    """Report wall time and peak RSS of each startup scenario in a fresh interpreter"""
+    path = path or DEFAULT_MODEL_PATH
+    for label, statement in STARTUP_SCENARIOS:
+        code = (
+            "import resource, time\n"
+            "start = time.perf_counter()\n"
+            f"{statement.format(path=path)}\n"
+            "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            print(f"{label}: failed ({error[-1] if error else result.returncode})")
+            continue
+        seconds, max_rss_kb = result.stdout.split()[-2:]
+        print(f"{label}: {float(seconds):.2f}s, peak RSS {int(max_rss_kb) / 1024:.0f} MB")
+
+if __name__ == "__main__":
+    measure_startup(sys.argv[1] if len(sys.argv) > 1 else None)
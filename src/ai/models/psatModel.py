@@ -21,6 +21,7 @@ class QuestionModel(BaseModel):
     selected_choice: Optional[Literal['a', 'b', 'c', 'd']] = None
     show_answer: bool = False  # Added this line
     is_current: bool = False  # Added this line
+    topic: Optional[str] = None
     
     def to_dict(self) -> Dict:
         return self.model_dump()
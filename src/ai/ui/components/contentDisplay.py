@@ -1,6 +1,6 @@
 import customtkinter as ctk
 import tkinter as tk
-from ai.ui.utils.parsers import parse_markdown
+from ai.ui.utils.parsers import parse_markdown, MarkdownStreamParser
 
 class ContentDisplay(ctk.CTkFrame):
     def __init__(self, parent):
@@ -17,6 +17,8 @@ class ContentDisplay(ctk.CTkFrame):
         self.content = ctk.CTkTextbox(self.content_frame, wrap="word", height=125, state="disabled", fg_color="#1E1E1E", text_color="#EAEAEA", border_color="#444444")
         self.content.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
         self.content.configure(state="disabled")
+        self.stream_parser = MarkdownStreamParser()
+        self.stream_role = "bot"
         # Enhanced tag configurations with better color contrast and hierarchy
         text_configs = {
             "user": {
@@ -105,6 +107,29 @@ class ContentDisplay(ctk.CTkFrame):
         self.content.see("end")
         self.content.configure(state="disabled")
 
+    def begin_stream(self, role = "bot"):
+        """Start displaying a streamed message."""
+        self.stream_parser.reset()
+        self.stream_role = role
+        self._insert_fragments([("\n🤖 " if role != "user" else "\n🧑 ", "emoji")])
+
+    def append_stream(self, chunk):
+        """Display the fragments of a streamed chunk that are finalized."""
+        self._insert_fragments(self.stream_parser.feed(chunk))
+
+    def end_stream(self):
+        """Display the remaining fragments of a streamed message."""
+        self._insert_fragments(self.stream_parser.flush())
+
+    def _insert_fragments(self, fragments):
+        if not fragments:
+            return
+        self.content.configure(state="normal")
+        for word, tag in fragments:
+            self.content.insert("end", f"{word}", tag if tag else self.stream_role)
+        self.content.see("end")
+        self.content.configure(state="disabled")
+
     def reset(self):
         self.content.configure(state="normal")
         self.content.delete("1.0", tk.END)
@@ -10,15 +10,14 @@ class QuestionView(ctk.CTkFrame):
         super().__init__(master, fg_color="transparent")
         self.model = model
         self.on_selection_change = on_selection_change
-        self.choice_vars = []
+        self.choice_vars = []  # Pool of choice radio buttons, reused across questions
+        self.visible_choices = 0
+        self.viewInitialized = False
         
         self._create_widgets()
         self._update_view()
-        self.viewInitialized = False
         
     def _create_widgets(self):
-        if self.model is None:
-            return
         # Top section for question and choices
         self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.pack(fill=tk.BOTH, expand=True)
@@ -29,7 +28,7 @@ class QuestionView(ctk.CTkFrame):
         
         self.question_label = ctk.CTkLabel(
             self.question_frame, 
-            text=f"Question #{self.model.question_id}:", 
+            text="", 
             anchor="w",
             pady=5,
             padx=5
@@ -38,38 +37,16 @@ class QuestionView(ctk.CTkFrame):
         
         self.question_text = ctk.CTkTextbox(self.question_frame, height=100)
         self.question_text.pack(fill=tk.BOTH, padx=5, pady=5)
-        self.question_text.insert("1.0", self.model.question_text)
         self.question_text.configure(state="disabled")
         
-        # Choices
+        # Choices are laid out in two columns of a single grid so pooled buttons
+        # can move between columns when the number of choices changes
         self.choices_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
         self.choices_frame.pack(fill=tk.BOTH, padx=10, pady=10)
+        self.choices_frame.grid_columnconfigure((0, 1), weight=1, uniform="choices")
         
         self.choice_var = tk.StringVar(value="")
         
-        # Create left and right frames for two columns
-        left_frame = ctk.CTkFrame(self.choices_frame, fg_color="transparent")
-        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        right_frame = ctk.CTkFrame(self.choices_frame, fg_color="transparent")
-        right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Split choices into two columns
-        choices_count = len(self.model.choices)
-        mid_point = (choices_count + 1) // 2
-        
-        for i, choice in enumerate(self.model.choices):
-            parent_frame = left_frame if i < mid_point else right_frame
-            choice_btn = ctk.CTkRadioButton(
-                parent_frame,
-                text=choice.value,
-                variable=self.choice_var,
-                value=choice.key,
-                command=self._on_choice_selection
-            )
-            choice_btn.pack(anchor="w", padx=20, pady=5)
-            self.choice_vars.append(choice_btn)
-        
         # Bottom section for Solution and Save button
         self.bottom_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.bottom_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=5)
@@ -100,47 +77,64 @@ class QuestionView(ctk.CTkFrame):
         self.model.selected_choice = selected
         if self.on_selection_change:
             self.on_selection_change(self.model)
+
+    def _acquire_choice_buttons(self, count: int):
+        """Grow the choice button pool to at least count buttons"""
+        while len(self.choice_vars) < count:
+            choice_btn = ctk.CTkRadioButton(
+                self.choices_frame,
+                text="",
+                variable=self.choice_var,
+                value="",
+                command=self._on_choice_selection
+            )
+            self.choice_vars.append(choice_btn)
+
+    def _layout_choices(self, count: int):
+        """Show the first count pooled buttons in two columns and hide the rest"""
+        if count == self.visible_choices:
+            return
+        self._acquire_choice_buttons(count)
+        mid_point = (count + 1) // 2
+        for i, choice_btn in enumerate(self.choice_vars):
+            if i < count:
+                row, column = (i, 0) if i < mid_point else (i - mid_point, 1)
+                choice_btn.grid(row=row, column=column, sticky="w", padx=20, pady=5)
+            elif i < self.visible_choices:
+                choice_btn.grid_remove()
+        self.visible_choices = count
     
     def _update_view(self):
-        if self.model is not None and self.model.selected_choice is not None:
-            self.choice_var.set(self.model.selected_choice)
-        # Update solution component
-        if hasattr(self, 'solution'):
-            self.solution.update_model(self.model)
-    
-    def update_model(self, model: QuestionModel):
-        """Update the view with a new model"""
-        self.model = model
-        
-        if not self.viewInitialized:
-            self._create_widgets()
+        if self.model is None:
+            self.question_label.configure(text="")
+            self._set_question_text("")
+            self._layout_choices(0)
+            self.choice_var.set("")
+            self.solution.update_model(None)
             return
-        # Update question text
-        self.question_text.configure(state="normal")
-        self.question_text.delete("1.0", tk.END)
-        self.question_text.insert("1.0", self.model.question_text)
-        self.question_text.configure(state="disabled")
-        
+
         # Update question number in label
         self.question_label.configure(text=f"Question #{self.model.question_id}:")
-        
-        # Reset choice selection
-        self.choice_var.set("")
-        
-        # Update choices text
-        choices_count = len(self.model.choices)
-        mid_point = (choices_count + 1) // 2
-        
-        for i, choice_btn in enumerate(self.choice_vars):
-            if i < len(self.model.choices):
-                choice_btn.configure(text=self.model.choices[i].value)
-                choice_btn.pack(anchor="w", padx=20, pady=5)
-            else:
-                choice_btn.pack_forget()  # Hide extra choices if any
-        
+        self._set_question_text(self.model.question_text or "")
+
+        # Update choices from the pool
+        self._layout_choices(len(self.model.choices))
+        for choice_btn, choice in zip(self.choice_vars, self.model.choices):
+            choice_btn.configure(text=choice.value, value=choice.key)
+
         # Set the selected choice if there is one
-        if self.model.selected_choice is not None:
-            self.choice_var.set(self.model.selected_choice)
-        
+        self.choice_var.set(self.model.selected_choice or "")
+
         # Update solution component
-        self.solution.update_model(self.model)
\ No newline at end of file
+        self.solution.update_model(self.model)
+
+    def _set_question_text(self, text: str):
+        self.question_text.configure(state="normal")
+        self.question_text.delete("1.0", tk.END)
+        self.question_text.insert("1.0", text)
+        self.question_text.configure(state="disabled")
+    
+    def update_model(self, model: QuestionModel):
+        """Update the view with a new model"""
+        self.model = model
+        self._update_view()
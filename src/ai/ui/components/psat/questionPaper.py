@@ -3,6 +3,7 @@ import tkinter as tk
 from ai.models.psatModel import QuestionModel, Choice
 from ai.ui.components.psat.questionTracker import QuestionTrackerView
 from ai.ui.components.psat.question import QuestionView
+from ai.ui.utils.psatUtils import ScoreCounter
 import json
 
 class QuestionPaperController(ctk.CTkFrame):
@@ -12,6 +13,9 @@ class QuestionPaperController(ctk.CTkFrame):
         self.status_bar = status_bar
         self.questions = questions
         self.is_evaluated = False
+        self.question_index = {}  # question_id -> position in self.questions
+        self._build_question_index()
+        self.score = ScoreCounter(self.questions)
         
         # Create main container frame
         self.main_frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -76,9 +80,7 @@ class QuestionPaperController(ctk.CTkFrame):
 
     def _calculate_score(self):
         """Calculate the current score"""
-        correct = sum(1 for q in self.questions if q.is_correct())
-        total = len(self.questions)
-        return correct, total
+        return self.score.correct, self.score.total
 
     def _update_progress_status(self):
         """Update progress bar and status text"""
@@ -89,20 +91,33 @@ class QuestionPaperController(ctk.CTkFrame):
             self.status_bar.update_status(0.0, "No questions loaded")
             return
             
-        answered = sum(1 for q in self.questions if q.selected_choice is not None)
+        answered = self.score.answered
         correct, _ = self._calculate_score()
-        progress = answered * 100 / total
+        progress = round(answered * 100 / total)
         
         status_text = (f"Score: {correct}/{total} correct | "
                     f"Progress: {answered}/{total} answered")
         self.status_bar.update_status(progress, status_text)
     
+    def _build_question_index(self):
+        """Index question positions by question_id for constant-time lookup"""
+        self.question_index = {q.question_id: i for i, q in enumerate(self.questions)}
+
+    def _get_question(self, question_id: int):
+        position = self.question_index.get(question_id)
+        return self.questions[position] if position is not None else None
+
     def _on_question_select(self, question_id: int):
         """Handle question selection from the tracker"""
-        self.question_view.update_model([q for q in self.questions if q.question_id == question_id][0])
+        question = self._get_question(question_id)
+        if question is None:
+            return
+        self.question_view.update_model(question)
     
     def _on_selection_change(self, updated_model: QuestionModel):
         """Handle answer selection in current question"""
+        self.score.update(updated_model)
+        
         # Update tracker button state
         self.tracker_view.update_question_state(
             updated_model.question_id,
@@ -110,7 +125,7 @@ class QuestionPaperController(ctk.CTkFrame):
         )
         
         # Calculate progress and update status bar
-        answered_count = sum(1 for q in self.questions if q.selected_choice is not None)
+        answered_count = self.score.answered
         progress = answered_count / len(self.questions)
         
         status_text = (f"Progress: {answered_count} of {len(self.questions)} "
@@ -121,7 +136,7 @@ class QuestionPaperController(ctk.CTkFrame):
         """Handle prompt submission from chat input"""
         # Here you would normally process the prompt and generate questions
         # For this example, we'll just update the status
-        self.status_bar.update_status(f"Processing prompt: {prompt_text[:30]}...", 0.2)
+        self.status_bar.update_status(0.2, f"Processing prompt: {prompt_text[:30]}...")
         
         # In a real implementation, you might call an AI model or API here
         # to generate questions based on the prompt
@@ -129,13 +144,14 @@ class QuestionPaperController(ctk.CTkFrame):
     
     def _save_answers(self):
         """Save the current answers and update status"""
+        self.score.audit(self.questions)
         correct, total = self._calculate_score()
-        answered = sum(1 for q in self.questions if q.selected_choice is not None)
+        answered = self.score.answered
         progress = answered / total
         
         status_text = (f"Saved! Score: {correct}/{total} ({(correct/total):.0%}) | "
                     f"Completed: {answered}/{total} ({progress:.0%})")
-        self.status_bar.update_status(status_text, progress)
+        self.status_bar.update_status(progress, status_text)
         
         # Save answers to JSON
         answers_data = {
@@ -145,7 +161,8 @@ class QuestionPaperController(ctk.CTkFrame):
             "score": {
                 "correct": correct,
                 "total": total,
-                "percentage": (correct/total) * 100
+                "percentage": (correct/total) * 100,
+                "topics": self.score.summary()["topics"]
             }
         }
         
@@ -182,7 +199,8 @@ class QuestionPaperController(ctk.CTkFrame):
                     correct_answer=q["correct_answer"].lower(),  # Ensure lowercase
                     explanation=str(q["explanation"]),
                     show_answer=False,
-                    is_current=q["is_current"]
+                    is_current=q["is_current"],
+                    topic=q.get("topic")
                 )
 
                 question_models.append(question_model)
@@ -192,6 +210,8 @@ class QuestionPaperController(ctk.CTkFrame):
 
         # Update the questions list
         self.questions = question_models
+        self._build_question_index()
+        self.score.reset(self.questions)
         
         # Update question view with first question
         if len(self.questions) > 0:
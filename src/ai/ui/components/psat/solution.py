@@ -7,13 +7,14 @@ class Solution(ctk.CTkFrame):
     def __init__(self, master, model: QuestionModel):
         super().__init__(master, fg_color="transparent")
         self.model = model
+        self.explanation_rendered = False  # Explanation text is only rendered when shown
         
         self._create_widgets()
         self._update_visibility()
     
     def _create_widgets(self):
         # Show answer checkbox
-        self.show_answer_var = tk.BooleanVar(value=self.model.show_answer)
+        self.show_answer_var = tk.BooleanVar(value=self.model.show_answer if self.model else False)
         self.show_answer_checkbox = ctk.CTkCheckBox(
             self,
             text="Show answer",
@@ -39,29 +40,36 @@ class Solution(ctk.CTkFrame):
         
         self.explanation_text = ctk.CTkTextbox(self.explanation_frame, height=60)
         self.explanation_text.pack(fill=tk.X, padx=5, pady=5)
-        self.explanation_text.insert("1.0", self.model.explanation)
         self.explanation_text.configure(state="disabled")
     
     def _on_show_answer_change(self):
+        if self.model is None:
+            self.show_answer_var.set(False)
+            return
         self.model.show_answer = self.show_answer_var.get()
         self._update_visibility()
     
+    def _render_explanation(self):
+        self.explanation_text.configure(state="normal")
+        self.explanation_text.delete("1.0", tk.END)
+        self.explanation_text.insert("1.0", self.model.explanation)
+        self.explanation_text.configure(state="disabled")
+        self.explanation_rendered = True
+    
     def _update_visibility(self):
-        if self.model.show_answer:
+        if self.model is not None and self.model.show_answer:
+            if not self.explanation_rendered:
+                self._render_explanation()
             self.explanation_frame.pack(fill=tk.X, padx=0, pady=5)
         else:
             self.explanation_frame.pack_forget()
     
     def update_model(self, model: QuestionModel):
         """Update the solution component with a new model"""
-        self.model = model
-        
-        # Update explanation text
-        self.explanation_text.configure(state="normal")
-        self.explanation_text.delete("1.0", tk.END)
-        self.explanation_text.insert("1.0", self.model.explanation)
-        self.explanation_text.configure(state="disabled")
+        if model is not self.model:
+            self.model = model
+            self.explanation_rendered = False
         
         # Update show answer checkbox
-        self.show_answer_var.set(self.model.show_answer)
-        self._update_visibility()
\ No newline at end of file
+        self.show_answer_var.set(self.model.show_answer if self.model else False)
+        self._update_visibility()
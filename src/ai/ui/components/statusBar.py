@@ -1,12 +1,18 @@
 import customtkinter as ctk
+import threading
 
 class StatusBar(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, max_fps=10):
         super().__init__(parent, height=30)
         self.pack(side="bottom", fill="x")
         self.grid_columnconfigure(1, weight=1)
         self.pack_propagate(False)
 
+        # Updates may come from any thread; the Tk thread polls for the latest one
+        self.poll_ms = max(1, int(1000 / max_fps))
+        self._lock = threading.Lock()
+        self._pending = None
+
         # Create progress label
         self.progress_label = ctk.CTkLabel(self, text="Status: Idle", anchor="w")
         self.progress_label.pack(side="left", padx=10, pady=5, expand=True, fill="x")
@@ -15,7 +21,39 @@ class StatusBar(ctk.CTkFrame):
         self.progress_bar = ctk.CTkProgressBar(self, orientation="horizontal", mode="determinate")
         self.progress_bar.pack(side="right", fill="x", padx=10, pady=5)
         self.progress_bar.set(0)
+        self.after(self.poll_ms, self._poll)
+
+    @staticmethod
+    def normalize(progress, status):
+        """Return (fraction, status) from either argument order.
+
+        Integers are percentages (0-100); floats between 0 and 1 are fractions.
+        Booleans are not a progress value and count as 0.
+        """
+        if isinstance(progress, str) and not isinstance(status, str):
+            progress, status = status, progress
+        if isinstance(progress, bool):
+            progress = 0.0
+        is_percent = isinstance(progress, int)
+        try:
+            progress = float(progress)
+        except (TypeError, ValueError):
+            progress = 0.0
+        if is_percent or progress > 1.0:
+            progress = progress / 100
+        return min(max(progress, 0.0), 1.0), status
 
     def update_status(self, progress, status):
-        self.progress_label.configure(text=f"Status: {status}")
-        self.progress_bar.set(progress / 100)
+        """Queue a status update from any thread, painted at most max_fps times a second"""
+        fraction, status = self.normalize(progress, status)
+        with self._lock:
+            self._pending = (fraction, status)
+
+    def _poll(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            fraction, status = pending
+            self.progress_label.configure(text=f"Status: {status}")
+            self.progress_bar.set(fraction)
+        self.after(self.poll_ms, self._poll)
@@ -2,14 +2,13 @@ from ai.ui.components import MenuBar, StatusBar, UserPrompt, ContentDisplay
 import customtkinter as ctk
 import threading
 import asyncio
-import time
-from ai.agent.SystemAgent import SystemAgent
 from ai.ui.components.psat.questionPaper import QuestionPaperController
 from ai.models.psatModel import QuestionModel, Choice
 from ai.ui.utils.psatUtils import create_sample_questions
-from ai.agent.utils.VoiceUtils import TTSQueue
+from ai.agent.utils.SpeechSegmenter import segment_for_speech
+from ai.agent.utils.Cancellation import CancellationToken, GenerationCancelled
 from threading import Thread
-from ai.agent.pts import process_audio
+from ai.agent.utils.VoskModels import preload_in_background
 
 # Add after the imports
 class ListeningIndicator(ctk.CTkCanvas):
@@ -35,12 +34,13 @@ ctk.set_default_color_theme("blue")
 class MainFrame(ctk.CTk):
     def __init__(self):
         super().__init__()
-        # Initialize TTSQueue with status callback
-        self.tts_queue = TTSQueue(status_callback=self.update_listening_indicator)
-        self.tts_queue.start_processing()
-        
-        self.systemAgent = SystemAgent()
+        # The LLM and voice stacks are slow to import, they are loaded by
+        # _load_backends once the window is shown
+        self.tts_queue = None
+        self.systemAgent = None
+        self.backends_ready = threading.Event()
         self.audio_thread = None
+        self.cancel_token = None  # Token of the request in progress
         self.configure(bg="#1E1E1E")
         self.title("AgentX - Ollama Chatbot")
         self.geometry("900x800")
@@ -117,17 +117,55 @@ class MainFrame(ctk.CTk):
         self.content_display = ContentDisplay(self.main_container)
         self.content_display.display_content("## Welcome to AgentX - Ollama Chatbot!\n\nPlease type your message in the box below and press `'Submit'` to chat with the chatbot.")
 
-        # Start audio processing
-        self.start_audio_processing()
+        self.after_idle(self.start_backends)
+
+    def start_backends(self):
+        """Load the LLM, TTS and speech backends in the background"""
+        self.update_status(0, "Loading language and voice backends...")
+        Thread(target=self._load_backends, daemon=True).start()
+        # Load the speech model, then start listening
+        preload_in_background(on_loaded=lambda model: self.start_audio_processing())
+
+    def _load_backends(self):
+        try:
+            from ai.agent.SystemAgent import SystemAgent
+
+            self.systemAgent = SystemAgent()
+            self.update_status(50, "Language model ready, loading voice...")
+        except Exception as e:
+            print(f"Failed to load the language model backend: {e}")
+        try:
+            from ai.agent.utils.VoiceUtils import TTSQueue
+
+            # Initialize TTSQueue with status callback
+            tts_queue = TTSQueue(status_callback=self.update_listening_indicator)
+            tts_queue.start_processing()
+            self.tts_queue = tts_queue
+        except Exception as e:
+            print(f"Failed to load the text to speech backend: {e}")
+        self.backends_ready.set()
+        self.update_status(100, "Ready" if self.systemAgent else "Language model unavailable")
+
+    def _wait_for_agent(self):
+        """Block a worker thread until the backends are loaded, returning whether the agent is usable"""
+        if not self.backends_ready.is_set():
+            self.update_status(0, "Waiting for backends to load...")
+            self.backends_ready.wait()
+        return self.systemAgent is not None
 
     def process_audio_callback(self, text, is_listening, is_playing):
         """Callback function to handle the recognized text and listening state."""
         self.listening_indicator.set_listening(is_listening, is_playing)
+        if is_listening:
+            # Wake word interrupts whatever is being generated or spoken
+            self.barge_in()
         if text:
             self.handle_user_input(text)
             
     def start_audio_processing(self):
         """Start audio processing in a separate thread."""
+        from ai.agent.pts import process_audio
+
         self.audio_thread = Thread(
             target=process_audio,
             args=(self.process_audio_callback,),
@@ -140,10 +178,26 @@ class MainFrame(ctk.CTk):
         # if requestResult:
         #     self.content_display.display_content(requestResult)
 
+    def barge_in(self):
+        """Cancel generation, synthesis and playback of the request in progress and return a token for a new one"""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        if self.tts_queue:
+            self.tts_queue.cancel()
+        self.cancel_token = CancellationToken()
+        return self.cancel_token
+
     def handle_user_input(self, input_text):
+        cancel_token = self.barge_in()
+
         def actionQuestions():
+            if not self._wait_for_agent():
+                return
             self.update_status(50, "Sent Request")
-            response = self.systemAgent.executeQuery(input_text)
+            try:
+                response = self.systemAgent.executeQuery(input_text, cancel_token)
+            except GenerationCancelled:
+                return
             
             questions = response.content
 
@@ -158,15 +212,20 @@ class MainFrame(ctk.CTk):
             self.update_status(100, "Completed")
             
         def action():
+            if not self._wait_for_agent():
+                return
             self.update_status(50, "Processing Request")
-            response = self.systemAgent.executeQuery(input_text)
+            try:
+                response = self.systemAgent.executeQuery(input_text, cancel_token)
+            except GenerationCancelled:
+                self.update_status(0, "Cancelled")
+                return
 
             responseText = response.content
             
             if self.tts_queue:
-                for sentence in responseText.split('.'):
-                    self.tts_queue.add_text(sentence)
-                    time.sleep(0.3)
+                for segment in segment_for_speech(responseText):
+                    self.tts_queue.add_text(segment, cancel_token=cancel_token)
             self.content_display.display_content(responseText, "user")
 
             self.update_status(100, "Completed")
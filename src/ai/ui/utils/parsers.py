@@ -109,7 +109,6 @@ def parse_multiline_code(lines, i):
         i += 1
     # Increment i to skip the closing ```
     i += 1
-    print(code_lines)
     return '\n'.join(code_lines), i
 
 def parse_table(lines, i):
@@ -137,6 +136,82 @@ def contains_emoji(line):
     return any(char in line for char in "😀😃😄😁😆😅😂🤣")
 
 def parse_emoji(line):
-    emoji_pattern = re.compile(r'[\U0001F600-\U0001F64F]')
-    emojis = emoji_pattern.findall(line)
-    return [(emoji, "emoji") for emoji in emojis]
+    emoji_pattern = re.compile(r'([\U0001F600-\U0001F64F])')
+    parts = emoji_pattern.split(line)
+    return [(part, "emoji" if j % 2 == 1 else None) for j, part in enumerate(parts) if part]
+
+class MarkdownStreamParser:
+    """Incremental counterpart of parse_markdown for streamed text.
+
+    Chunks are appended with feed(); only fragments of lines (or code fences /
+    tables) that can no longer change are returned, so the caller can insert
+    them straight into a text widget. Calling flush() at the end of the stream
+    emits whatever is still pending. Concatenating all emitted fragments gives
+    the same result as parse_markdown on the full text.
+    """
+    TEXT = "text"
+    CODE = "code"
+    TABLE = "table"
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._pending = ""
+        self._state = self.TEXT
+        self._block = []
+
+    def feed(self, chunk):
+        """Append a chunk of text and return the newly finalized (text, tag) fragments."""
+        if not chunk:
+            return []
+        self._pending += chunk
+        if '\n' not in chunk:
+            return []
+        *lines, self._pending = self._pending.split('\n')
+        parsed_text = []
+        for line in lines:
+            parsed_text.extend(self._consume_line(line))
+        return parsed_text
+
+    def flush(self):
+        """Finalize the stream and return the remaining fragments."""
+        parsed_text = self._consume_line(self._pending)
+        parsed_text.extend(self._close_block())
+        self.reset()
+        return parsed_text
+
+    def _consume_line(self, line):
+        if self._state == self.CODE:
+            self._block.append(line)
+            if line.startswith('```') and len(self._block) > 1:
+                return self._close_block()
+            return []
+
+        if self._state == self.TABLE:
+            if '|' in line:
+                self._block.append(line)
+                return []
+            parsed_text = self._close_block()
+            parsed_text.extend(self._consume_line(line))
+            return parsed_text
+
+        if line.strip() == "" or is_heading(line):
+            return parse_markdown(line)
+        if line.startswith('```'):
+            self._state = self.CODE
+            self._block = [line]
+            return []
+        if '|' in line:
+            self._state = self.TABLE
+            self._block = [line]
+            return []
+        return parse_markdown(line)
+
+    def _close_block(self):
+        if self._state == self.TEXT:
+            return []
+        parsed_text = parse_markdown('\n'.join(self._block))
+        self._state = self.TEXT
+        self._block = []
+        return parsed_text
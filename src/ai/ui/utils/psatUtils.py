@@ -1,5 +1,71 @@
+import logging
+from typing import Dict, List
 from ai.models.psatModel import QuestionModel, Choice
 
+logger = logging.getLogger(__name__)
+
+class ScoreCounter:
+    """Running answered/correct counters for a question paper, overall and per topic.
+
+    update() adjusts the counters in O(1) from the last state recorded for the
+    question, so callers don't have to rescan the paper on every selection.
+    """
+    def __init__(self, questions: List[QuestionModel] = None):
+        self.reset(questions or [])
+
+    def reset(self, questions: List[QuestionModel]):
+        """Recompute all counters from scratch"""
+        self.total = 0
+        self.answered = 0
+        self.correct = 0
+        self.topics: Dict[str, Dict[str, int]] = {}
+        self._states = {}
+        for question in questions:
+            self.total += 1
+            self._topic(question)["total"] += 1
+            self._apply(question, +1)
+
+    def update(self, question: QuestionModel):
+        """Account for a changed selection on a single question"""
+        if question.question_id not in self._states:
+            return
+        self._apply(question, -1, self._states[question.question_id])
+        self._apply(question, +1)
+
+    def audit(self, questions: List[QuestionModel]) -> bool:
+        """Check the running counters against a full recomputation, resetting them on mismatch"""
+        expected = ScoreCounter(questions)
+        consistent = expected.summary() == self.summary()
+        if not consistent:
+            logger.warning(f"Score counters out of sync: {self.summary()} != {expected.summary()}")
+            self.reset(questions)
+        return consistent
+
+    def summary(self) -> Dict:
+        return {
+            "answered": self.answered,
+            "correct": self.correct,
+            "total": self.total,
+            "topics": {topic: dict(counts) for topic, counts in self.topics.items()}
+        }
+
+    def _topic(self, question: QuestionModel) -> Dict[str, int]:
+        topic = question.topic or "general"
+        if topic not in self.topics:
+            self.topics[topic] = {"answered": 0, "correct": 0, "total": 0}
+        return self.topics[topic]
+
+    def _apply(self, question: QuestionModel, sign: int, state=None):
+        if state is None:
+            state = (question.selected_choice is not None, question.is_correct())
+            self._states[question.question_id] = state
+        answered, correct = state
+        topic = self._topic(question)
+        self.answered += sign * answered
+        self.correct += sign * correct
+        topic["answered"] += sign * answered
+        topic["correct"] += sign * correct
+
 def create_sample_questions():
     """Create sample question data using the new QuestionModel format"""
     questions = []
@@ -1,3 +1,10 @@
+import time
+
+START_TIME = time.perf_counter()
+
+import argparse
+import subprocess
+import sys
 from threading import Thread
 from dotenv import load_dotenv
 from pathlib import Path
@@ -40,5 +47,44 @@ async def main():
         if app:
             app.destroy()
 
+def profile_imports(module: str = "ai.ui.mainFrame", top: int = 15):
+    """Print the slowest top-level packages imported by module, using python -X importtime"""
+    # The marker separates interpreter startup imports from those of module
+    code = f"import sys; sys.stderr.write('import time: marker\\n'); import {module}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=BASE_DIR)
+    lines = result.stderr.splitlines()
+    lines = lines[lines.index("import time: marker") + 1:] if "import time: marker" in lines else lines
+    total_us = 0
+    packages = {}  # top-level non-stdlib package -> cumulative import time of its first import
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if name == module:
+            total_us = int(cumulative_us)
+        elif "." not in name and name not in sys.stdlib_module_names:
+            packages[name] = max(packages.get(name, 0), int(cumulative_us))
+    if result.returncode != 0:
+        print(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+    print(f"Import time of {module}: {total_us / 1000:.1f}ms, slowest packages:")
+    for name, cumulative_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+def profile_startup():
+    """Print the time from interpreter start to the window being shown, then the import report"""
+    app = MainFrame()
+    app.update()
+    # Measured before the import report, which runs its own interpreter in a subprocess
+    shown_ms = 1000 * (time.perf_counter() - START_TIME)
+    app.destroy()
+    print(f"Window shown {shown_ms:.0f}ms after start")
+    profile_imports()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="AgentX PSAT generator")
+    parser.add_argument("--profile-startup", action="store_true", help="Report import times and time to first window, then exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        profile_startup()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from ai.agent.utils.Cancellation import CancellationToken, GenerationCancelled
+
+# Get project base folder
+BASE_DIR = Path(__file__).resolve().parent
+
+# Load .env file from the base folder
+load_dotenv(dotenv_path=f"{BASE_DIR}/.env")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RequestRejected(Exception):
+    """Raised when a request is rejected by admission control"""
+    def __init__(self, status_code: int, message: str, retry_after: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class Lease:
+    """A generation slot held by one request, release() may be called more than once"""
+    def __init__(self, limiter: "RequestLimiter", client: str):
+        self.limiter = limiter
+        self.client = client
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.limiter._release(self.client)
+
+class RequestLimiter:
+    """Admission control for generation requests.
+
+    At most max_active requests generate at once and up to max_queued more
+    wait in arrival order; further requests are rejected with 503. Each client
+    may have at most per_client requests running or waiting, beyond which it
+    gets 429.
+    """
+    def __init__(self, max_active: int = 4, max_queued: int = 32, per_client: int = 2):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.per_client = per_client
+        self.active = 0
+        self.queued = 0
+        self.clients = defaultdict(int)  # client -> requests running or waiting
+        self._slots = asyncio.Semaphore(max_active)
+
+    async def acquire(self, client: str) -> Lease:
+        """Wait for a generation slot, raising RequestRejected if the request cannot be queued"""
+        if self.clients.get(client, 0) >= self.per_client:
+            raise RequestRejected(429, f"At most {self.per_client} concurrent requests per client", retry_after=1)
+        # Only a request that cannot get a slot right away waits in the queue
+        queued = self._slots.locked()
+        if queued and self.queued >= self.max_queued:
+            raise RequestRejected(503, "Server busy, try again later", retry_after=5)
+        self.clients[client] += 1
+        if queued:
+            self.queued += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self._forget(client)
+            raise
+        finally:
+            if queued:
+                self.queued -= 1
+        self.active += 1
+        return Lease(self, client)
+
+    def _release(self, client: str):
+        self.active -= 1
+        self._slots.release()
+        self._forget(client)
+
+    def _forget(self, client: str):
+        self.clients[client] -= 1
+        if self.clients[client] <= 0:
+            del self.clients[client]
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "clients": len(self.clients),
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "per_client": self.per_client,
+        }
+
+_DONE = object()
+
+async def iterate_in_thread(executor: ThreadPoolExecutor, chunks_factory: Callable[[], Iterator[str]],
+                            cancel_token: CancellationToken, max_buffered: int = 16):
+    """Run a blocking chunk generator in executor and yield its chunks.
+
+    At most max_buffered chunks wait for the client, after that the generating
+    thread blocks, so a slow reader slows generation down instead of growing
+    memory. Closing this generator cancels the token and unblocks the thread.
+    """
+    loop = asyncio.get_running_loop()
+    buffer = asyncio.Queue(maxsize=max_buffered)
+
+    def produce():
+        try:
+            for chunk in chunks_factory():
+                asyncio.run_coroutine_threadsafe(buffer.put(chunk), loop).result()
+            result = _DONE
+        except GenerationCancelled:
+            # The reader is gone
+            return
+        except Exception as e:
+            result = e
+        asyncio.run_coroutine_threadsafe(buffer.put(result), loop).result()
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            chunk = await buffer.get()
+            if chunk is _DONE:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+        await producer
+    finally:
+        cancel_token.cancel()
+        # Make room for a producer blocked on a full buffer so it sees the cancellation
+        while not buffer.empty():
+            buffer.get_nowait()
+
+class GeneratorService:
+    """Chat and question paper generation shared by all HTTP clients"""
+    def __init__(self, max_active: int = 4, max_queued: int = 32, per_client: int = 2):
+        self.limiter = RequestLimiter(max_active, max_queued, per_client)
+        self.executor = ThreadPoolExecutor(max_workers=max_active, thread_name_prefix="generate")
+        self._system_agent = None
+        self._question_agent = None
+
+    @property
+    def system_agent(self):
+        if self._system_agent is None:
+            from ai.agent.SystemAgent import SystemAgent
+
+            self._system_agent = SystemAgent()
+        return self._system_agent
+
+    @property
+    def question_agent(self):
+        if self._question_agent is None:
+            from ai.agent.QuestionAgent import SystemAgent as QuestionAgent
+
+            self._question_agent = QuestionAgent()
+        return self._question_agent
+
+    @staticmethod
+    def client_id(request: Request) -> str:
+        return request.headers.get("x-client-id") or (request.client.host if request.client else "unknown")
+
+    @staticmethod
+    async def read_prompt(request: Request) -> dict:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or not isinstance(body.get("prompt"), str) or not body["prompt"].strip():
+            raise RequestRejected(400, 'Expected a JSON body with a non-empty "prompt"')
+        return body
+
+    async def chat(self, request: Request):
+        body = await self.read_prompt(request)
+        lease = await self.limiter.acquire(self.client_id(request))
+        cancel_token = CancellationToken()
+        chunks = iterate_in_thread(self.executor, lambda: self.system_agent.streamQuery(body["prompt"], cancel_token), cancel_token)
+
+        if body.get("stream", True):
+            async def stream():
+                try:
+                    async for chunk in chunks:
+                        yield chunk
+                finally:
+                    await chunks.aclose()
+                    lease.release()
+
+            # The background task also runs when the client disconnects before the stream starts
+            return StreamingResponse(stream(), media_type="text/plain; charset=utf-8", background=BackgroundTask(lease.release))
+
+        content = []
+        try:
+            async for chunk in chunks:
+                if await request.is_disconnected():
+                    # Nobody is waiting for the answer, stop generating it
+                    return Response(status_code=499)
+                content.append(chunk)
+        finally:
+            await chunks.aclose()
+            lease.release()
+        return JSONResponse({"content": "".join(content)})
+
+    async def questions(self, request: Request):
+        body = await self.read_prompt(request)
+        lease = await self.limiter.acquire(self.client_id(request))
+        cancel_token = CancellationToken()
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(self.executor, self.question_agent.executeQuery, body["prompt"], cancel_token)
+        except asyncio.CancelledError:
+            cancel_token.cancel()
+            raise
+        finally:
+            lease.release()
+        return JSONResponse({"questions": response.content, "metadata": response.metadata})
+
+    async def health(self, request: Request):
+        return JSONResponse(self.limiter.stats())
+
+def create_app(max_active: int = 4, max_queued: int = 32, per_client: int = 2) -> Starlette:
+    service = GeneratorService(max_active, max_queued, per_client)
+
+    def endpoint(handler):
+        async def handle(request: Request):
+            try:
+                return await handler(request)
+            except RequestRejected as e:
+                headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+                return JSONResponse({"error": str(e)}, status_code=e.status_code, headers=headers)
+            except Exception as e:
+                logger.error(f"{request.url.path} failed: {e}")
+                return JSONResponse({"error": "Generation failed"}, status_code=500)
+        return handle
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        service.executor.shutdown(wait=False, cancel_futures=True)
+
+    app = Starlette(
+        routes=[
+            Route("/chat", endpoint=endpoint(service.chat), methods=["POST"]),
+            Route("/questions", endpoint=endpoint(service.questions), methods=["POST"]),
+            Route("/health", endpoint=service.health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless chat and question paper generation server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-active", type=int, default=4, help="Requests generating at once")
+    parser.add_argument("--max-queued", type=int, default=32, help="Requests waiting for a slot before 503")
+    parser.add_argument("--per-client", type=int, default=2, help="Requests per client running or waiting before 429")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_app(args.max_active, args.max_queued, args.per_client), host=args.host, port=args.port)
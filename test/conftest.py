@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app is run from src/, so its packages are imported as top-level "ai"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,64 @@
+"""Regenerate the WAV fixtures used by the tests.
+
+utterance.wav is a speech-like recording made without a microphone: voiced
+syllables (harmonics of a drifting pitch under a syllable envelope) with
+short fricative bursts, two words groups split by a 0.5 s pause, over room
+noise that gets louder halfway through and has keyboard clicks in it.
+
+    python test/fixtures/make_fixtures.py
+"""
+import wave
+from pathlib import Path
+import numpy as np
+
+SAMPLE_RATE = 16000
+FIXTURES = Path(__file__).resolve().parent
+
+# Labels of utterance.wav in seconds, read by the tests
+UTTERANCE_SECONDS = 6.2
+SPEECH = ((1.0, 1.9), (2.4, 3.2))
+CLICKS = (0.55, 1.4, 2.15, 3.9, 4.6, 5.35)
+
+def syllables(start, end, rng, t):
+    audio = np.zeros(len(t))
+    position = start
+    while position < end - 0.08:
+        length = min(rng.uniform(0.14, 0.24), end - position)
+        mask = (t >= position) & (t < position + length)
+        local = t[mask] - position
+        envelope = np.sin(np.pi * local / length) ** 0.6
+        pitch = rng.uniform(110, 170) * (1 + 0.1 * local / length)
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+        audio[mask] += rng.uniform(1500, 2600) * envelope * voiced
+        if rng.random() < 0.5:
+            # Fricative onset of the next syllable
+            burst = (t >= position + length) & (t < position + length + 0.03)
+            audio[burst] += rng.normal(0, 500, burst.sum())
+            length += 0.03
+        position += length
+    return audio
+
+def utterance(seed=7):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(UTTERANCE_SECONDS * SAMPLE_RATE)) / SAMPLE_RATE
+    # Room noise that steps up when a fan starts, plus mains hum
+    noise = rng.normal(0, 1, len(t))
+    noise = np.convolve(noise, np.ones(4) / 2, mode="same") * np.where(t < 3.5, 45, 90)
+    audio = noise + 25 * np.sin(2 * np.pi * 50 * t)
+    for start, end in SPEECH:
+        audio += syllables(start, end, rng, t)
+    for click in CLICKS:
+        at = int(click * SAMPLE_RATE)
+        audio[at:at + 40] += 1400 * np.exp(-np.arange(40) / 8) * rng.choice((-1, 1))
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+def write_wav(path: Path, samples: np.ndarray):
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(samples.tobytes())
+
+if __name__ == "__main__":
+    write_wav(FIXTURES / "utterance.wav", utterance())
@@ -0,0 +1,39 @@
+"""Sentence splitting for TTS; run with PYTHONPATH=src for the throughput benchmark"""
+import time
+import pytest
+from ai.agent.utils.SpeechSegmenter import markdown_to_speech_lines, segment_for_speech, split_sentences
+
+# (markdown input, expected sentences from split_sentences over the speech lines)
+CORPUS = [
+    ("Gravity is 9.8 m/s². It pulls objects down.", ["Gravity is 9.8 m/s².", "It pulls objects down."]),
+    ("Dr. Smith measured 3.14 radians, i.e. half a turn. Done!", ["Dr. Smith measured 3.14 radians, i.e. half a turn.", "Done!"]),
+    ("# Newton's laws\nThe **first** law is inertia.", ["Newton's laws", "The first law is inertia."]),
+    ("Use `F = ma`. Here:\n```python\nprint(1.5)\n```\nThat's it.", ["Use F = ma.", "Here:", "That's it."]),
+    ("| a | b |\n|---|---|\n| 1 | 2 |\nAfter the table.", ["After the table."]),
+    ("1. Mass is scalar.\n2. Force is a vector.", ["Mass is scalar.", "Force is a vector."]),
+    ("Is it true? Yes! It is... really. \"Quoted.\" Next.", ["Is it true?", "Yes!", "It is... really.", "\"Quoted.\"", "Next."]),
+    ("Visit e.g. the lab at 5 p.m. today.", ["Visit e.g. the lab at 5 p.m. today."]),
+    ("Values like .5 and 0.25 stay whole. Version 2.0 shipped.", ["Values like .5 and 0.25 stay whole.", "Version 2.0 shipped."]),
+    ("He said no. Then left.", ["He said no.", "Then left."]),
+    ("See question No. 4 and no. 7 first. Then rest.", ["See question No. 4 and no. 7 first.", "Then rest."]),
+    ("They met at St. Paul's. The first st. Then home.", ["They met at St. Paul's.", "The first st.", "Then home."]),
+]
+
+def sentences_of(text):
+    return [s for line in markdown_to_speech_lines(text) for s in split_sentences(line)]
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_split_sentences(text, expected):
+    assert sentences_of(text) == expected
+
+def benchmark(repeat: int = 2000):
+    text = "\n".join(text for text, _ in CORPUS) + "\n"
+    sentence_count = sum(len(expected) for _, expected in CORPUS)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        segment_for_speech(text)
+    elapsed = time.perf_counter() - start
+    print(f"{sentence_count * repeat / elapsed:,.0f} sentences/sec")
+
+if __name__ == "__main__":
+    benchmark()
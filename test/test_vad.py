@@ -0,0 +1,70 @@
+"""End of utterance decisions of EnergyVAD on a WAV fixture, against the old detect_silence rule"""
+from pathlib import Path
+import pytest
+from ai.agent.pts import detect_silence
+from ai.agent.utils.AudioSources import CHUNK_FRAMES, SAMPLE_RATE
+from ai.agent.utils.VAD import EnergyVAD, detect_segments, wav_chunks
+from fixtures.make_fixtures import SPEECH, UTTERANCE_SECONDS
+
+UTTERANCE = Path(__file__).resolve().parent / "fixtures" / "utterance.wav"
+CHUNK_SECONDS = CHUNK_FRAMES / SAMPLE_RATE
+
+@pytest.fixture(scope="module")
+def chunks():
+    return list(wav_chunks(str(UTTERANCE), CHUNK_FRAMES))
+
+def endpoint_time(chunks, vad):
+    """Audio time at the end of the chunk where SpeechPipeline would finish the utterance"""
+    position = 0.0
+    for data in chunks:
+        vad.process(data)
+        position += len(data) / 2 / SAMPLE_RATE
+        if position > SPEECH[0][0] + CHUNK_SECONDS and vad.endpoint:
+            return position
+    return None
+
+def detect_silence_endpoint(chunks, silence_seconds=2.0):
+    """The same decision made the old way: silent chunks for silence_seconds after the last loud one"""
+    position = last_sound = 0.0
+    for data in chunks:
+        position += len(data) / 2 / SAMPLE_RATE
+        if not detect_silence(data):
+            last_sound = position
+        elif position > SPEECH[0][0] + CHUNK_SECONDS and position - last_sound > silence_seconds:
+            return position
+    return None
+
+def test_speech_segments(chunks):
+    segments = detect_segments(chunks, EnergyVAD(SAMPLE_RATE), CHUNK_SECONDS)
+    assert len(segments) == len(SPEECH)
+    for (start, end), (speech_start, speech_end) in zip(segments, SPEECH):
+        assert speech_start - CHUNK_SECONDS <= start <= speech_start
+        assert speech_end <= end <= speech_end + CHUNK_SECONDS
+
+def test_endpoint_after_last_word(chunks):
+    vad = EnergyVAD(SAMPLE_RATE, endpoint_ms=2000)
+    ended = endpoint_time(chunks, vad)
+    speech_end = SPEECH[-1][1]
+    assert ended is not None
+    assert speech_end + 2.0 <= ended <= speech_end + 2.0 + vad.hangover_frames * vad.frame_ms / 1000 + CHUNK_SECONDS
+
+def test_pause_between_words_does_not_end_utterance(chunks):
+    # The 0.5s pause is shorter than even a tight endpoint
+    assert endpoint_time(chunks, EnergyVAD(SAMPLE_RATE, endpoint_ms=800)) > SPEECH[-1][1]
+
+def test_noise_floor_follows_louder_room(chunks):
+    vad = EnergyVAD(SAMPLE_RATE)
+    before_speech = int(SPEECH[0][0] / CHUNK_SECONDS)
+    for data in chunks[:before_speech]:
+        vad.process(data)
+    quiet_floor = vad.noise_floor
+    for data in chunks[before_speech:]:
+        vad.process(data)
+    # The room noise doubles after the utterance
+    assert vad.noise_floor > 1.5 * quiet_floor
+    assert not vad.is_speech
+
+def test_detect_silence_misses_endpoint_on_clicks(chunks):
+    # Keyboard clicks in the tail keep resetting the peak based rule
+    assert detect_silence_endpoint(chunks) is None
+    assert UTTERANCE_SECONDS - SPEECH[-1][1] > 2.0 + CHUNK_SECONDS